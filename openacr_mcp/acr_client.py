@@ -1,15 +1,28 @@
 """Subprocess wrapper for OpenACR CLI tools (acr, acr_ed, amc, abt).
 
-All commands run via subprocess.run with cwd set to the openacr directory.
-PATH is extended to include {openacr_dir}/bin so sub-commands spawned by
-acr_ed can locate each other.
+Every command runs with cwd set to the working directory and an environment
+whose PATH starts with {openacr_dir}/bin, so sub-commands spawned by acr_ed
+can locate each other. Process-global state (os.environ, the process cwd)
+is left untouched.
+
+Queries and edits go through subprocess.run. amc and abt runs with an
+output cap go through _run_bounded instead: Popen in a new session, reader
+threads that drain both pipes and discard output past the cap, and a
+process-group kill on timeout.
+
+Each call is a fresh process. acr has no server/REPL mode that could keep
+the ssim database loaded between queries, so repeated reads are cached in
+the MCP server layer instead.
 """
 
 from __future__ import annotations
 
 import os
 import re
+import signal
 import subprocess
+import threading
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -19,6 +32,11 @@ from typing import Optional
 # ssim tuple parser (ported from concept_parser/ssim_importer.py)
 # ---------------------------------------------------------------------------
 
+# Attributes are separated by two or more spaces; single spaces may appear
+# inside unquoted values (e.g. ``comment:Algo Cross-Reference``).
+_RE_SSIM_SEP = re.compile(r"  +")
+
+
 def parse_ssim_line(line: str) -> Optional[tuple[str, dict[str, str]]]:
     """Parse one ssim tuple line into (type_tag, {key: value}).
 
@@ -30,7 +48,7 @@ def parse_ssim_line(line: str) -> Optional[tuple[str, dict[str, str]]]:
     if not line or line.startswith("#"):
         return None
 
-    parts = re.split(r"  +", line)
+    parts = _RE_SSIM_SEP.split(line)
     if not parts:
         return None
 
@@ -58,6 +76,9 @@ def parse_ssim_output(text: str) -> list[dict[str, str]]:
     """
     results: list[dict[str, str]] = []
     for line in text.splitlines():
+        # Skip acr's trailing report line without tokenizing it
+        if line.startswith("report."):
+            continue
         parsed = parse_ssim_line(line)
         if parsed is None:
             continue
@@ -70,11 +91,22 @@ def parse_ssim_output(text: str) -> list[dict[str, str]]:
     return results
 
 
+def _drain(stream, limit: int, parts: list[str]) -> None:
+    """Read ``stream`` to EOF, appending at most ``limit`` characters to ``parts``."""
+    kept = 0
+    for chunk in iter(lambda: stream.read(8192), ""):
+        if kept < limit:
+            piece = chunk[:limit - kept]
+            parts.append(piece)
+            kept += len(piece)
+    stream.close()
+
+
 # ---------------------------------------------------------------------------
 # Result dataclass
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class AcrResult:
     """Result of running an acr/acr_ed/amc/abt command."""
     ok: bool
@@ -105,22 +137,26 @@ class AcrResult:
 class AcrClient:
     """Subprocess wrapper for OpenACR CLI tools.
 
-    On init, adds {openacr_dir}/bin to os.environ["PATH"] so all
-    subprocesses (and their children) can find OpenACR commands by name.
+    Every subprocess runs with ``self._env``, a copy of os.environ with
+    {openacr_dir}/bin prepended to PATH, so it (and its children) can find
+    OpenACR commands by name.
     """
 
     def __init__(self, openacr_dir: str | Path):
         self.openacr_dir = Path(openacr_dir).resolve()
         self._work_dir: Path | None = None
+        self._ns_type_cache: dict[str, str] = {}
         self.bin_dir = self.openacr_dir / "bin"
         if not self.bin_dir.exists():
             raise FileNotFoundError(f"OpenACR bin dir not found: {self.bin_dir}")
-        # Export bin dir into process PATH so all subprocesses inherit it.
-        # This is critical: acr_ed spawns sub-commands (acr_in, amc_vis, acr)
-        # that must be findable by name on PATH.
-        bin_str = str(self.bin_dir)
-        if bin_str not in os.environ.get("PATH", ""):
-            os.environ["PATH"] = f"{bin_str}:{os.environ.get('PATH', '')}"
+        # Put bin dir first on the subprocess PATH. This is critical: acr_ed
+        # spawns sub-commands (acr_in, amc_vis, acr) that must be findable by
+        # name on PATH.
+        path = os.environ.get("PATH", "")
+        self._env = {
+            **os.environ,
+            "PATH": f"{self.bin_dir}{os.pathsep}{path}" if path else str(self.bin_dir),
+        }
 
     @property
     def work_dir(self) -> Path:
@@ -134,6 +170,7 @@ class AcrClient:
     @work_dir.setter
     def work_dir(self, path: Path | None) -> None:
         self._work_dir = path
+        self._ns_type_cache = {}
 
     def _run(self, args: list[str], *, timeout: int = 30) -> AcrResult:
         """Run a command and return an AcrResult."""
@@ -141,6 +178,7 @@ class AcrClient:
             proc = subprocess.run(
                 args,
                 cwd=str(self.work_dir),
+                env=self._env,
                 capture_output=True,
                 text=True,
                 timeout=timeout,
@@ -168,15 +206,90 @@ class AcrClient:
             result.records = parse_ssim_output(proc.stdout)
         return result
 
+    def _run_bounded(self, args: list[str], *, timeout: int, max_chars: int) -> AcrResult:
+        """Like _run, but keep at most ``max_chars`` of stdout and of stderr.
+
+        Both pipes are drained to EOF by reader threads so the child never
+        blocks on a full pipe; anything past the cap is discarded as it
+        arrives instead of being buffered. The child runs in its own process
+        group, so on timeout the whole group (including build jobs that
+        inherited the pipes) is killed and the call returns on schedule.
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            proc = subprocess.Popen(
+                args,
+                cwd=str(self.work_dir),
+                env=self._env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+                start_new_session=True,
+            )
+        except FileNotFoundError:
+            return AcrResult(
+                ok=False,
+                stderr=f"Command not found: {args[0]}",
+                returncode=-1,
+            )
+
+        stdout_parts: list[str] = []
+        stderr_parts: list[str] = []
+        readers = [
+            threading.Thread(target=_drain, args=(proc.stdout, max_chars, stdout_parts), daemon=True),
+            threading.Thread(target=_drain, args=(proc.stderr, max_chars, stderr_parts), daemon=True),
+        ]
+        for t in readers:
+            t.start()
+        try:
+            proc.wait(timeout=timeout)
+            # A grandchild may still hold the pipes open after the child exits
+            for t in readers:
+                t.join(max(0.0, deadline - time.monotonic()))
+            timed_out = any(t.is_alive() for t in readers)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        if timed_out:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            proc.wait()
+            # Readers are daemon threads; abandon any still blocked on a pipe
+            for t in readers:
+                t.join(1.0)
+            return AcrResult(
+                ok=False,
+                stderr=f"Command timed out after {timeout}s",
+                returncode=-1,
+            )
+
+        stdout = "".join(stdout_parts)
+        result = AcrResult(
+            ok=proc.returncode == 0,
+            stdout=stdout,
+            stderr="".join(stderr_parts),
+            returncode=proc.returncode,
+        )
+        if result.ok:
+            result.records = parse_ssim_output(stdout)
+        return result
+
     # -- acr insert --------------------------------------------------------
 
     def acr_insert(self, line: str) -> AcrResult:
         """Insert a raw ssim record via ``acr -insert -write``."""
+        return self.acr_insert_many([line])
+
+    def acr_insert_many(self, lines: list[str]) -> AcrResult:
+        """Insert several raw ssim records with a single ``acr -insert -write``."""
         try:
             proc = subprocess.run(
                 ["acr", "-insert", "-write"],
-                input=line + "\n",
+                input="".join(line + "\n" for line in lines),
                 cwd=str(self.work_dir),
+                env=self._env,
                 capture_output=True,
                 text=True,
                 timeout=30,
@@ -227,32 +340,45 @@ class AcrClient:
         if comment:
             cmd.extend(["-comment", comment])
         cmd.append("-write")
+        self._ns_type_cache.pop(name, None)
         return self._run(cmd, timeout=60)
 
     def acr_ed_delete(self, pattern: str) -> AcrResult:
         """Run ``acr -del -write <pattern>``."""
         cmd = ["acr", "-del", "-write", pattern]
+        self._ns_type_cache.clear()
         return self._run(cmd, timeout=30)
 
     def acr_ed_rename(self, old: str, new: str) -> AcrResult:
         """Run ``acr_ed -rename <old> <new> -write``."""
         cmd = ["acr_ed", "-rename", old, new, "-write"]
+        self._ns_type_cache.clear()
         return self._run(cmd, timeout=60)
 
     # -- amc ---------------------------------------------------------------
 
-    def amc(self, namespace: str = "") -> AcrResult:
-        """Run ``amc [namespace]`` to generate C++ code."""
+    def amc(self, namespace: str = "", *, max_output: int | None = None) -> AcrResult:
+        """Run ``amc [namespace]`` to generate C++ code.
+
+        With ``max_output``, only that many characters of stdout/stderr are kept.
+        """
         cmd = ["amc"]
         if namespace:
             cmd.append(namespace)
+        if max_output is not None:
+            return self._run_bounded(cmd, timeout=120, max_chars=max_output)
         return self._run(cmd, timeout=120)
 
     # -- abt ---------------------------------------------------------------
 
-    def abt(self, target: str) -> AcrResult:
-        """Run ``abt <target>`` to build."""
+    def abt(self, target: str, *, max_output: int | None = None) -> AcrResult:
+        """Run ``abt <target>`` to build.
+
+        With ``max_output``, only that many characters of stdout/stderr are kept.
+        """
         cmd = ["abt", target]
+        if max_output is not None:
+            return self._run_bounded(cmd, timeout=300, max_chars=max_output)
         return self._run(cmd, timeout=300)
 
     # -- acr graph traversal -----------------------------------------------
@@ -276,11 +402,13 @@ class AcrClient:
 
     def acr_merge(self, line: str) -> AcrResult:
         """Upsert a record via ``acr -merge -write`` (update if exists, insert if not)."""
+        self._ns_type_cache.clear()
         try:
             proc = subprocess.run(
                 ["acr", "-merge", "-write"],
                 input=line + "\n",
                 cwd=str(self.work_dir),
+                env=self._env,
                 capture_output=True,
                 text=True,
                 timeout=30,
@@ -362,6 +490,7 @@ class AcrClient:
     def acr_ed_delete_target(self, target: str) -> AcrResult:
         """Run ``acr_ed -del -target <target> -write`` (cascades everything)."""
         cmd = ["acr_ed", "-del", "-target", target, "-write"]
+        self._ns_type_cache.pop(target, None)
         return self._run(cmd, timeout=60)
 
     # -- acr_ed scaffolding ------------------------------------------------
@@ -398,10 +527,20 @@ class AcrClient:
         return self.acr(f"dmmeta.field:{ctype}.%")
 
     def get_ns_type(self, namespace: str) -> str | None:
-        """Return the nstype for a namespace (e.g. 'ssimdb', 'exe'), or None if not found."""
+        """Return the nstype for a namespace (e.g. 'ssimdb', 'exe'), or None if not found.
+
+        Found nstypes are memoized; the memo is dropped by the operations that
+        can create, delete or rewrite a namespace record, and on work_dir change.
+        """
+        cached = self._ns_type_cache.get(namespace)
+        if cached is not None:
+            return cached
         result = self.acr(f"dmmeta.ns:{namespace}")
         if result.ok and result.records:
-            return result.records[0].get("nstype")
+            nstype = result.records[0].get("nstype")
+            if nstype:
+                self._ns_type_cache[namespace] = nstype
+            return nstype
         return None
 
     def list_generated_headers(self, namespace: str) -> list[Path]:
@@ -422,3 +561,19 @@ class AcrClient:
         if not full_path.exists():
             raise FileNotFoundError(f"Header not found: {full_path}")
         return full_path.read_text(encoding="utf-8")
+
+    def get_generated_code_head(self, header_path: str, limit: int = 50000) -> tuple[bytes, int | None]:
+        """Read the first ``limit`` bytes of a generated header file.
+
+        Returns (head, total_size). total_size is None unless the file is
+        longer than ``limit``; only then is the file stat'ed.
+        """
+        full_path = self.work_dir / header_path
+        try:
+            with open(full_path, "rb") as f:
+                head = f.read(limit + 1)
+                if len(head) <= limit:
+                    return head, None
+                return head[:limit], os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Header not found: {full_path}") from None
@@ -18,19 +18,29 @@ Claude Code config (.mcp.json):
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import operator
 import os
 import re
 import shutil
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from mcp.server import FastMCP
 
-from .acr_client import AcrClient
-from .header_parser import parse_header_file
+try:
+    import orjson
+except ImportError:  # optional: pip install "openacr-mcp[fast]"
+    orjson = None
+
+from .acr_client import AcrClient, AcrResult
+from .header_parser import ParsedHeader, parse_header_file
 
 # ---------------------------------------------------------------------------
 # Global state — initialized once at startup
@@ -38,29 +48,283 @@ from .header_parser import parse_header_file
 
 _client: AcrClient | None = None
 
+# Serializes "mutate + invalidate" sequences and builds. Cache reads stay
+# lock-free: each cache is replaced or cleared by a single assignment.
+_mut_lock = threading.RLock()
+
+# Full dmmeta.ctype / dmmeta.field tables, loaded lazily for search() and
+# keyed by (ssim path, mtime_ns) -> rows so edits made outside the server
+# are picked up; _invalidate() also drops them whenever a tool modifies the
+# schema. Field rows are stored as (record, field, lowercased comment,
+# lowercased arg) so search() never re-lowercases the table.
+_all_ctypes_cache: tuple[tuple[str, int], list[dict[str, str]]] | None = None
+_all_fields_cache: tuple[tuple[str, int], list[tuple[dict[str, str], str, str, str]]] | None = None
+
+# Parsed generated headers, keyed by path -> (mtime_ns, size, parsed).
+# A stat() mismatch means the header was regenerated and must be re-parsed.
+_parsed_header_cache: dict[Path, tuple[int, int, ParsedHeader]] = {}
+
+# Generated header lists, keyed by (gen dir, namespace) -> (dir mtime_ns, headers).
+_headers_dir_cache: dict[tuple[str, str], tuple[int, list[Path]]] = {}
+
+# Work dirs where create_ctype skipped its amc run, in deferral order.
+# Entries are removed by a full run_amc in that dir or by flush_amc, which
+# regenerates each one even after set_project has moved elsewhere.
+_amc_pending: list[Path] = []
+
+# Results of read-only query tools, keyed by (tool, argument)
+# -> (monotonic timestamp, result). Entries expire after _QUERY_TTL seconds
+# and are dropped by _invalidate().
+_QUERY_TTL = 5.0
+_QUERY_CACHE_MAX = 512
+_query_cache: dict[tuple[str, str], tuple[float, AcrResult]] = {}
+
+# Default page size for tools that return record lists.
+_DEFAULT_LIMIT = 500
+
+# Namespace types accepted by create_target.
+_VALID_NSTYPES = frozenset({"ssimdb", "exe", "lib", "protocol"})
+
+# Generated helper ctypes that get_usage_examples does not document.
+_INTERNAL_TYPES = frozenset({"FieldId"})
+
+# ssim line inserted for each enum constant by create_fconst(s) / create_enum.
+_FCONST_TMPL = 'dmmeta.fconst  fconst:{}  value:"{}"  comment:"{}"'
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 def _json(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
     return json.dumps(obj, indent=2)
 
 
+def _json_compact(obj: Any) -> str:
+    """Serialize without whitespace — for status payloads nobody reads by eye."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
 def _error(msg: str, **extra: Any) -> str:
     return _json({"error": msg, **extra})
 
 
-def _client_or_error() -> AcrClient | str:
+class _ClientNotInitialized(Exception):
+    """Raised by _require_client() before main() has created the client."""
+
+
+def _require_client() -> AcrClient:
     if _client is None:
-        return _error("OpenACR client not initialized")
+        raise _ClientNotInitialized
     return _client
 
 
+def _parse_cached(path: Path) -> ParsedHeader:
+    """Parse a generated header, reusing the previous result if unchanged on disk."""
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    entry = _parsed_header_cache.get(path)
+    if entry is not None and entry[:2] == key:
+        return entry[2]
+    parsed = parse_header_file(path)
+    _parsed_header_cache[path] = (*key, parsed)
+    return parsed
+
+
+def _invalidate() -> None:
+    """Drop every cache derived from the schema or the generated code."""
+    global _all_ctypes_cache, _all_fields_cache
+    _all_ctypes_cache = None
+    _all_fields_cache = None
+    _parsed_header_cache.clear()
+    _headers_dir_cache.clear()
+    _query_cache.clear()
+
+
+def _mutating(fn):
+    """Mark a tool as modifying the schema or generated code (invalidates caches)."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _mut_lock:
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _invalidate()
+    return wrapper
+
+
+def _cached_query(key: tuple[str, str], run: Callable[[], AcrResult]) -> AcrResult:
+    """Run a read-only query, reusing a successful result younger than _QUERY_TTL."""
+    now = time.monotonic()
+    hit = _query_cache.get(key)
+    if hit is not None and now - hit[0] < _QUERY_TTL:
+        return hit[1]
+    result = run()
+    if result.ok:
+        if len(_query_cache) >= _QUERY_CACHE_MAX:
+            _query_cache.clear()
+        _query_cache[key] = (now, result)
+    return result
+
+
+def _page_error(offset: int, limit: int) -> str | None:
+    if offset < 0 or limit < 1:
+        return _error("offset must be >= 0 and limit must be >= 1", offset=offset, limit=limit)
+    return None
+
+
+def _paged(result: AcrResult, offset: int, limit: int) -> str:
+    """Serialize one page of a query result, with total/offset/limit/has_more."""
+    if not result.ok:
+        return _json(result.to_dict())
+    records = result.records
+    page = records[offset:offset + limit]
+    return _json({
+        "ok": True,
+        "records": page,
+        "count": len(page),
+        "total": len(records),
+        "offset": offset,
+        "limit": limit,
+        "has_more": offset + len(page) < len(records),
+    })
+
+
+def _ssim_key(client: AcrClient, table: str) -> tuple[str, int] | None:
+    """Return (path, mtime_ns) of data/dmmeta/<table>.ssim, or None if absent."""
+    path = client.work_dir / "data" / "dmmeta" / f"{table}.ssim"
+    try:
+        return str(path), path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _get_all_ctypes(client: AcrClient) -> list[dict[str, str]]:
+    """Return every dmmeta.ctype record, querying acr only when ctype.ssim changed."""
+    global _all_ctypes_cache
+    key = _ssim_key(client, "ctype")
+    entry = _all_ctypes_cache
+    if key is not None and entry is not None and entry[0] == key:
+        return entry[1]
+    result = client.acr("dmmeta.ctype:%")
+    if not result.ok:
+        return []
+    if key is not None:
+        _all_ctypes_cache = (key, result.records)
+    return result.records
+
+
+def _get_all_fields(client: AcrClient) -> list[tuple[dict[str, str], str, str, str]]:
+    """Return every dmmeta.field row, querying acr only when field.ssim changed."""
+    global _all_fields_cache
+    key = _ssim_key(client, "field")
+    entry = _all_fields_cache
+    if key is not None and entry is not None and entry[0] == key:
+        return entry[1]
+    result = client.acr("dmmeta.field:%")
+    if not result.ok:
+        return []
+    rows = [
+        (r, r.get("field", ""), r.get("comment", "").lower(), r.get("arg", "").lower())
+        for r in result.records
+    ]
+    if key is not None:
+        _all_fields_cache = (key, rows)
+    return rows
+
+
+def _cached_headers(client: AcrClient, namespace: str) -> list[Path]:
+    """List generated headers for a namespace, reusing the last listing while
+    the include/gen directory is unmodified."""
+    gen_dir = client.work_dir / "include" / "gen"
+    try:
+        mtime = gen_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        return client.list_generated_headers(namespace)
+    key = (str(gen_dir), namespace)
+    entry = _headers_dir_cache.get(key)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+    headers = client.list_generated_headers(namespace)
+    _headers_dir_cache[key] = (mtime, headers)
+    return headers
+
+
+_CAMEL1 = re.compile(r"([A-Z]+)([A-Z][a-z])")
+_CAMEL2 = re.compile(r"([a-z0-9])([A-Z])")
+
+
+@functools.lru_cache(maxsize=1024)
 def _camel_to_snake(name: str) -> str:
     """Convert CamelCase to snake_case (e.g. ReadingStatus -> reading_status)."""
-    s = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", name)
-    s = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", s)
-    return s.lower()
+    return _CAMEL2.sub(r"\1_\2", _CAMEL1.sub(r"\1_\2", name)).lower()
+
+
+# Assignment-line templates used by _format_field_assign.
+_FK_ASSIGN_TMPL = 'rec.{name} = "some_{ref}";  // FK to {arg}'
+_ASSIGN_TMPL = "rec.{name} = {value};  // {note}"
+_UNKNOWN_ASSIGN_TMPL = "// rec.{name} = ...;  // {arg} {comment}"
+
+# Example value for scalar field types, keyed by arg; called with the
+# field's dflt so integer fields can show their schema default.
+_EXAMPLE_VALUES: dict[str, Callable[[str], str]] = {
+    **dict.fromkeys(
+        ("u8", "u16", "u32", "u64", "i8", "i16", "i32", "i64"),
+        lambda dflt: dflt if dflt else "0",
+    ),
+    "bool": lambda dflt: "true",
+    "float": lambda dflt: "0.0",
+    "double": lambda dflt: "0.0",
+}
+
+
+_FIELD_SUMMARY_KEYS = ("field", "arg", "reftype", "comment")
+_field_summary_get = operator.itemgetter(*_FIELD_SUMMARY_KEYS)
+
+
+def _field_summary(f: dict[str, str]) -> dict[str, str]:
+    """Reshape a dmmeta.field record into the name/arg/reftype/comment summary."""
+    try:
+        field, arg, reftype, comment = _field_summary_get(f)
+    except KeyError:
+        # Record is missing an attribute; treat it as empty
+        field, arg, reftype, comment = (f.get(k, "") for k in _FIELD_SUMMARY_KEYS)
+    return {"name": field.rpartition(".")[2], "arg": arg, "reftype": reftype, "comment": comment}
+
+
+def _resolve_fconst_field(field: str) -> str:
+    """Expand a ctype shorthand to its pkey field (ns.Type -> ns.Type.type)."""
+    parts = field.split(".")
+    if len(parts) == 2:
+        ns, type_name = parts
+        return f"{ns}.{type_name}.{_camel_to_snake(type_name)}"
+    return field
+
+
+def _format_field_assign(f: dict[str, str]) -> str:
+    """Return an example C++ assignment line for a field record."""
+    fname = sys.intern(f.get("field", "").rpartition(".")[2])
+    arg = sys.intern(f.get("arg", ""))
+    reftype = f.get("reftype", "")
+    fcomment = f.get("comment", "")
+    dflt = f.get("dflt", "")
+
+    if reftype == "Pkey":
+        # FK field — set as string
+        ref_type = arg.rpartition(".")[2]
+        return _FK_ASSIGN_TMPL.format(name=fname, ref=_camel_to_snake(ref_type), arg=arg)
+    if "cstring" in arg or "Smallstr" in arg or "Comment" in arg:
+        value = '"example"'
+    else:
+        example = _EXAMPLE_VALUES.get(arg)
+        if example is None:
+            return _UNKNOWN_ASSIGN_TMPL.format(name=fname, arg=arg, comment=fcomment)
+        value = example(dflt)
+    return _ASSIGN_TMPL.format(name=fname, value=value, note=fcomment or arg)
+
 
 # ---------------------------------------------------------------------------
 # MCP Server
@@ -81,7 +345,7 @@ hash tables, linked lists, and other data structures — all from the relational
 
 1. **Query** existing schemas: `list_namespaces`, `list_ctypes`, `list_fields`, `list_fconsts`, `list_ssimfiles`, `list_finputs`, `query`, `search`
 2. **Author** new schemas: `create_target` → `create_ctype` → `create_field` → `create_fconst`
-3. **Generate** C++ code: `run_amc`
+3. **Generate** C++ code: `run_amc` (or `flush_amc` to run it only if `create_ctype` deferred it)
 4. **Build**: `run_abt`
 5. **Discover** generated API: `get_functions`, `list_generated_headers`, `get_generated_code`
 
@@ -117,7 +381,8 @@ Start with `create_target` to create a namespace:
 
 To create an enum:
 1. `create_ctype` with a -subset pkey field whose arg is algo.Smallstr20 (or similar)
-2. `create_fconst` for each enum value on the pkey field (field = "ns.Type.type", value = "MyValue")
+2. `create_fconst` for each enum value on the pkey field (field = "ns.Type.type", value = "MyValue"),
+   or `create_fconsts` to add them all in one call
 
 ## Building Executables
 
@@ -179,9 +444,21 @@ upstream OpenACR installation.  All reads/writes stay local to the project.
 """,
 )
 
+
+def _tool(fn):
+    """Register ``fn`` as an MCP tool, turning a missing client into a JSON error."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except _ClientNotInitialized:
+            return _error("OpenACR client not initialized")
+    return server.tool()(wrapper)
+
+
 # ===== Group 0: Project Management ========================================
 
-@server.tool()
+@_tool
 def init_project(path: str) -> str:
     """Bootstrap a standalone project directory.
 
@@ -195,11 +472,10 @@ def init_project(path: str) -> str:
     Returns:
         JSON with the resolved project_dir on success, or an error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
 
-    project = Path(path).resolve()
+    # Relative paths are taken relative to the openacr dir
+    project = (client.openacr_dir / path).resolve()
     data_dst = project / "data"
 
     if data_dst.exists():
@@ -222,7 +498,8 @@ def init_project(path: str) -> str:
     return _json({"ok": True, "project_dir": str(project)})
 
 
-@server.tool()
+@_tool
+@_mutating
 def set_project(path: str = "") -> str:
     """Switch the working directory to a standalone project (or back to openacr).
 
@@ -232,15 +509,13 @@ def set_project(path: str = "") -> str:
     Returns:
         JSON with the active work_dir on success, or an error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
 
     if not path:
         client.work_dir = None
         return _json({"ok": True, "work_dir": str(client.work_dir)})
 
-    resolved = Path(path).resolve()
+    resolved = (client.openacr_dir / path).resolve()
     if not (resolved / "data" / "dmmeta").is_dir():
         return _error(f"Invalid project directory — missing data/dmmeta at {resolved}")
     if not (resolved / "bin").exists():
@@ -252,21 +527,18 @@ def set_project(path: str = "") -> str:
 
 # ===== Group 1: Schema Query (read-only) =================================
 
-@server.tool()
+@_tool
 def list_namespaces() -> str:
     """List all OpenACR namespaces.
 
     Returns:
         JSON list of namespace records with ns, nstype, license, comment.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    result = client.list_namespaces()
-    return _json(result.to_dict())
+    client = _require_client()
+    return _json(_cached_query(("list_namespaces", ""), lambda: client.list_namespaces()).to_dict())
 
 
-@server.tool()
+@_tool
 def get_namespace_tree(namespace: str) -> str:
     """Get a complete tree view of a namespace — all ctypes, fields, fconsts,
     ssimfiles, cfmt records, and reverse references in one call.
@@ -280,33 +552,34 @@ def get_namespace_tree(namespace: str) -> str:
     Returns:
         JSON with the tree output as indented ssim text.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr(f"dmmeta.ns:{namespace}", tree=True)
     if result.ok:
         return _json({"ok": True, "namespace": namespace, "tree": result.stdout})
     return _json(result.to_dict())
 
 
-@server.tool()
-def list_ctypes(namespace: str) -> str:
+@_tool
+def list_ctypes(namespace: str, offset: int = 0, limit: int = _DEFAULT_LIMIT) -> str:
     """List all ctypes (structs) in a namespace.
 
     Args:
         namespace: The namespace to query (e.g., "algo", "acr", "dmmeta")
+        offset: Index of the first record to return (default 0)
+        limit: Maximum number of records to return (default 500)
 
     Returns:
-        JSON list of ctype records.
+        JSON page of ctype records with total, offset, limit, and has_more.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    result = client.list_ctypes(namespace)
-    return _json(result.to_dict())
+    client = _require_client()
+    err = _page_error(offset, limit)
+    if err:
+        return err
+    result = _cached_query(("list_ctypes", namespace), lambda: client.list_ctypes(namespace))
+    return _paged(result, offset, limit)
 
 
-@server.tool()
+@_tool
 def get_ctype(ctype: str) -> str:
     """Get full detail for a ctype including cross-references (tree view).
 
@@ -316,95 +589,121 @@ def get_ctype(ctype: str) -> str:
     Returns:
         JSON with tree output showing the ctype and its related records.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.get_ctype(ctype)
     if result.ok:
         return _json({"ok": True, "tree": result.stdout})
     return _json(result.to_dict())
 
 
-@server.tool()
-def list_fields(ctype: str) -> str:
+@_tool
+def list_fields(ctype: str, offset: int = 0, limit: int = _DEFAULT_LIMIT) -> str:
     """List all fields for a ctype.
 
     Args:
         ctype: The ctype name (e.g., "algo.Bool", "dmmeta.Ctype")
+        offset: Index of the first record to return (default 0)
+        limit: Maximum number of records to return (default 500)
 
     Returns:
-        JSON list of field records with field, arg, reftype, dflt, comment.
+        JSON page of field records (field, arg, reftype, dflt, comment) with
+        total, offset, limit, and has_more.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    result = client.list_fields(ctype)
-    return _json(result.to_dict())
+    client = _require_client()
+    err = _page_error(offset, limit)
+    if err:
+        return err
+    result = _cached_query(("list_fields", ctype), lambda: client.list_fields(ctype))
+    return _paged(result, offset, limit)
 
 
-@server.tool()
-def query(pattern: str) -> str:
+@_tool
+def query(pattern: str, offset: int = 0, limit: int = _DEFAULT_LIMIT) -> str:
     """Run a raw acr query against the ssimfile database.
 
     Args:
         pattern: acr query pattern (e.g., "dmmeta.ctype:algo.%", "dmmeta.field:acr.FDb.%")
+        offset: Index of the first record to return (default 0)
+        limit: Maximum number of records to return (default 500)
 
     Returns:
-        JSON list of matching records.
+        JSON page of matching records with total, offset, limit, and has_more.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    result = client.acr(pattern)
-    return _json(result.to_dict())
+    client = _require_client()
+    err = _page_error(offset, limit)
+    if err:
+        return err
+    result = _cached_query(("query", pattern), lambda: client.acr(pattern))
+    return _paged(result, offset, limit)
 
 
-@server.tool()
-def search(text: str) -> str:
+@_tool
+def search(text: str, offset: int = 0, limit: int = _DEFAULT_LIMIT) -> str:
     """Search for ctypes, fields, and comments matching a text string.
 
-    Queries multiple acr patterns and deduplicates results.
+    Filters the full ctype and field tables, which are loaded once and
+    cached until a tool modifies the schema.
 
     Args:
         text: Search text to match against ctype names, field names, and comments.
+        offset: Index of the first match to return, applied to ctypes and fields separately
+        limit: Maximum number of ctypes and of fields to return (default 500 each)
 
     Returns:
-        JSON with matching ctypes and fields.
+        JSON with a page of matching ctypes and fields; ctype_count and
+        field_count are the totals, has_more is set if either list continues.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
+    err = _page_error(offset, limit)
+    if err:
+        return err
 
     results: dict[str, Any] = {"query": text, "ctypes": [], "fields": []}
 
-    # Search ctype names
-    ctype_result = client.acr(f"dmmeta.ctype:%{text}%")
-    if ctype_result.ok:
-        results["ctypes"] = ctype_result.records
-
-    # Search field names
-    field_result = client.acr(f"dmmeta.field:%.{text}%")
-    if field_result.ok:
-        results["fields"].extend(field_result.records)
-
-    # Search field arg types
-    field_arg_result = client.acr(f"dmmeta.field:%")
-    if field_arg_result.ok:
-        text_lower = text.lower()
-        for rec in field_arg_result.records:
-            comment = rec.get("comment", "").lower()
-            arg = rec.get("arg", "").lower()
-            if text_lower in comment or text_lower in arg:
-                if rec not in results["fields"]:
-                    results["fields"].append(rec)
-
-    results["ctype_count"] = len(results["ctypes"])
-    results["field_count"] = len(results["fields"])
+    ctypes_entry, fields_entry = _all_ctypes_cache, _all_fields_cache
+    if (ctypes_entry is not None and ctypes_entry[0] == _ssim_key(client, "ctype")
+            and fields_entry is not None and fields_entry[0] == _ssim_key(client, "field")):
+        all_ctypes, all_fields = ctypes_entry[1], fields_entry[1]
+    else:
+        # Cold cache — load both tables concurrently
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            ctypes_future = ex.submit(_get_all_ctypes, client)
+            fields_future = ex.submit(_get_all_fields, client)
+        all_ctypes = ctypes_future.result()
+        all_fields = fields_future.result()
+
+    # Ctype names (same as acr pattern dmmeta.ctype:%text%)
+    results["ctypes"] = [r for r in all_ctypes if text in r.get("ctype", "")]
+
+    # One pass over the field table: field names (same as acr pattern
+    # dmmeta.field:%.text%), then arg types and comments (case-insensitive).
+    # Each record lands in at most one list, so no dedup is needed.
+    name_pat = "." + text
+    text_lower = text.lower()
+    name_hits: list[dict[str, str]] = []
+    other_hits: list[dict[str, str]] = []
+    for rec, field, comment_lower, arg_lower in all_fields:
+        if name_pat in field:
+            name_hits.append(rec)
+        elif text_lower in comment_lower or text_lower in arg_lower:
+            other_hits.append(rec)
+    results["fields"] = name_hits + other_hits
+
+    ctype_count = len(results["ctypes"])
+    field_count = len(results["fields"])
+    end = offset + limit
+    results["ctypes"] = results["ctypes"][offset:end]
+    results["fields"] = results["fields"][offset:end]
+    results["ctype_count"] = ctype_count
+    results["field_count"] = field_count
+    results["offset"] = offset
+    results["limit"] = limit
+    results["has_more"] = end < max(ctype_count, field_count)
 
     return _json(results)
 
 
-@server.tool()
+@_tool
 def list_fconsts(namespace: str, ctype: str = "") -> str:
     """List enum constants (fconsts) in a namespace or for a specific ctype.
 
@@ -415,9 +714,7 @@ def list_fconsts(namespace: str, ctype: str = "") -> str:
     Returns:
         JSON list of fconst records with fconst, value, and comment.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     if ctype:
         pattern = f"dmmeta.fconst:{ctype}.%"
     else:
@@ -426,7 +723,7 @@ def list_fconsts(namespace: str, ctype: str = "") -> str:
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def list_ssimfiles(namespace: str) -> str:
     """List all ssimfiles (data tables) in a namespace.
 
@@ -439,14 +736,12 @@ def list_ssimfiles(namespace: str) -> str:
     Returns:
         JSON list of ssimfile records with ssimfile and ctype.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr(f"dmmeta.ssimfile:{namespace}.%")
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def list_finputs(target: str) -> str:
     """List all runtime table inputs (finputs) for an exe target.
 
@@ -458,14 +753,12 @@ def list_finputs(target: str) -> str:
     Returns:
         JSON list of finput records showing which ssimfiles the target reads.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr(f"dmmeta.finput:{target}.%")
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def get_downstream(pattern: str, levels: int = 1) -> str:
     """Get downstream dependencies — records that depend on the matched records.
 
@@ -479,15 +772,13 @@ def get_downstream(pattern: str, levels: int = 1) -> str:
     Returns:
         JSON list of matched records plus their downstream dependents.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     levels = max(1, min(100, levels))
     result = client.acr_ndown(pattern, levels)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def get_upstream(pattern: str, levels: int = 1) -> str:
     """Get upstream references — records that the matched records depend on.
 
@@ -501,15 +792,13 @@ def get_upstream(pattern: str, levels: int = 1) -> str:
     Returns:
         JSON list of matched records plus their upstream dependencies.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     levels = max(1, min(100, levels))
     result = client.acr_nup(pattern, levels)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def find_unused(pattern: str) -> str:
     """Find records matching the pattern that are not referenced by any other record.
 
@@ -522,14 +811,12 @@ def find_unused(pattern: str) -> str:
     Returns:
         JSON list of unreferenced records.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_unused(pattern)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def get_record_meta(pattern: str) -> str:
     """Get schema metadata for records matching the pattern.
 
@@ -542,14 +829,12 @@ def get_record_meta(pattern: str) -> str:
     Returns:
         JSON list of metadata records describing the schema.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_meta(pattern)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def select_fields(pattern: str, fields: list[str]) -> str:
     """Query records with field projection — only return specified columns.
 
@@ -562,9 +847,7 @@ def select_fields(pattern: str, fields: list[str]) -> str:
     Returns:
         JSON with raw projected output text.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     if not fields:
         return _error("Must specify at least one field to project")
     result = client.acr_select_fields(pattern, fields)
@@ -573,7 +856,7 @@ def select_fields(pattern: str, fields: list[str]) -> str:
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def get_input_tables(target: str) -> str:
     """List all ssimfiles that a target reads as input at runtime.
 
@@ -587,14 +870,12 @@ def get_input_tables(target: str) -> str:
     Returns:
         JSON list of input ssimfile records.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_in(target)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
 def visualize_ctype(ctype: str) -> str:
     """Generate an ASCII art diagram showing a ctype's field structure and relationships.
 
@@ -607,9 +888,7 @@ def visualize_ctype(ctype: str) -> str:
     Returns:
         JSON with the ASCII art diagram as text.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.amc_vis(ctype)
     if result.ok:
         return _json({"ok": True, "ctype": ctype, "diagram": result.stdout})
@@ -618,7 +897,8 @@ def visualize_ctype(ctype: str) -> str:
 
 # ===== Group 2: Schema Authoring (wrap acr_ed) ============================
 
-@server.tool()
+@_tool
+@_mutating
 def create_target(name: str, nstype: str, comment: str = "") -> str:
     """Create a new namespace/target. This is the entry point for any new project.
 
@@ -630,27 +910,29 @@ def create_target(name: str, nstype: str, comment: str = "") -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    if nstype not in ("ssimdb", "exe", "lib", "protocol"):
+    client = _require_client()
+    if nstype not in _VALID_NSTYPES:
         return _error(f"Invalid nstype '{nstype}'. Must be one of: ssimdb, exe, lib, protocol")
     result = client.acr_ed_create_target(name, nstype, comment)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_ctype(
     namespace: str,
     name: str,
     comment: str = "",
     subset: str = "",
     separator: str = "",
+    defer_amc: bool = True,
 ) -> str:
     """Create a new ctype (struct) in a namespace.
 
     For ssimdb namespaces, automatically creates the required ssimfile and
-    cfmt records so the type can be read/printed in Tuple format.
+    cfmt records so the type can be read/printed in Tuple format. By default
+    the amc run that follows is deferred so several types and fields can be
+    authored first; call ``flush_amc`` (or ``run_amc``) when done.
 
     Args:
         namespace: Target namespace (e.g., "myns")
@@ -660,13 +942,13 @@ def create_ctype(
                 field's arg type. Important for enum types where you want a string pkey.
         separator: Key separator for composite keys (default: "."). Use "/" for
                    junction tables with composite pkeys like "movie/actor".
+        defer_amc: Skip regenerating code after inserting the ssimfile/cfmt
+                   records (default True); pass False to run amc immediately.
 
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     ctype_name = f"{namespace}.{name}"
     args = ["-ctype", ctype_name]
     if subset:
@@ -682,34 +964,33 @@ def create_ctype(
     if nstype == "ssimdb":
         ssimfile_name = f"{namespace}.{_camel_to_snake(name)}"
         ssim_line = f"dmmeta.ssimfile  ssimfile:{ssimfile_name}  ctype:{ctype_name}"
-        ssim_result = client.acr_insert(ssim_line)
-        if not ssim_result.ok:
-            return _error(
-                f"ctype created but ssimfile insert failed: {ssim_result.stderr.strip()}",
-                ctype=ctype_name,
-            )
         # Auto-insert cfmt so the type has ReadStrptrMaybe / Print (needed by finput)
         cfmt_line = (
             f'dmmeta.cfmt  cfmt:{ctype_name}.String  printfmt:Tuple'
             f'  read:Y  print:Y  sep:""  genop:Y  comment:""'
         )
-        cfmt_result = client.acr_insert(cfmt_line)
-        if not cfmt_result.ok:
+        insert_result = client.acr_insert_many([ssim_line, cfmt_line])
+        if not insert_result.ok:
             return _error(
-                f"ctype created but cfmt insert failed: {cfmt_result.stderr.strip()}",
+                f"ctype created but ssimfile/cfmt insert failed: {insert_result.stderr.strip()}",
                 ctype=ctype_name,
             )
-        # Re-run amc now that ssimfile + cfmt exist
-        client.amc()
+        # Re-run amc now that ssimfile + cfmt exist, unless the caller batches it
+        if defer_amc:
+            if client.work_dir not in _amc_pending:
+                _amc_pending.append(client.work_dir)
+        else:
+            client.amc()
 
-    # Re-read the result since we may have fixed the amc error
+    # ssimdb: report the auto-inserted records and whether amc still has to run
     if nstype == "ssimdb":
         return _json({"ok": True, "ctype": ctype_name, "ssimfile_auto_created": True,
-                       "cfmt_auto_created": True})
+                       "cfmt_auto_created": True, "amc_deferred": defer_amc})
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_field(
     ctype: str,
     name: str,
@@ -745,9 +1026,7 @@ def create_field(
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     args = ["-field", f"{ctype}.{name}", "-arg", arg, "-reftype", reftype]
     if dflt:
         args.extend(["-dflt", dflt])
@@ -771,7 +1050,8 @@ def create_field(
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_fconst(field: str, value: str, comment: str = "") -> str:
     """Add an enum constant to a field.
 
@@ -788,24 +1068,52 @@ def create_fconst(field: str, value: str, comment: str = "") -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    # Auto-derive pkey field name if only ctype was given (ns.Type -> ns.Type.type)
-    parts = field.split(".")
-    if len(parts) == 2:
-        ns, type_name = parts
-        pkey_name = _camel_to_snake(type_name)
-        field = f"{ns}.{type_name}.{pkey_name}"
+    client = _require_client()
+    field = _resolve_fconst_field(field)
     fconst_key = f"{field}/{value}"
-    line = f'dmmeta.fconst  fconst:{fconst_key}  value:"{value}"  comment:"{comment}"'
+    line = _FCONST_TMPL.format(fconst_key, value, comment)
     result = client.acr_insert(line)
     if result.ok:
         return _json({"ok": True, "fconst": fconst_key})
     return _json({"ok": False, "error": result.stderr.strip()})
 
 
-@server.tool()
+@_tool
+@_mutating
+def create_fconsts(field: str, values: list[dict[str, str]]) -> str:
+    """Add several enum constants to a field with a single acr insert.
+
+    Same as calling ``create_fconst`` once per value, but all records are
+    written in one ``acr -insert`` invocation. ``field`` accepts the same
+    ctype shorthand as ``create_fconst``.
+
+    Args:
+        field: Parent field or ctype (e.g., "myns.MyEnum" or "myns.MyEnum.my_enum")
+        values: Constants to add, each {"value": "Active", "comment": "..."} (comment optional)
+
+    Returns:
+        JSON with success status and the created fconst keys, or error.
+    """
+    client = _require_client()
+    if not values:
+        return _error("values must not be empty")
+    missing = [i for i, v in enumerate(values) if not v.get("value")]
+    if missing:
+        return _error("every entry needs a 'value'", indexes=missing)
+    field = _resolve_fconst_field(field)
+    keys = [f"{field}/{v['value']}" for v in values]
+    lines = [
+        _FCONST_TMPL.format(key, v["value"], v.get("comment", ""))
+        for key, v in zip(keys, values)
+    ]
+    result = client.acr_insert_many(lines)
+    if result.ok:
+        return _json({"ok": True, "fconsts": keys})
+    return _json({"ok": False, "error": result.stderr.strip()})
+
+
+@_tool
+@_mutating
 def create_enum(
     namespace: str,
     name: str,
@@ -829,9 +1137,7 @@ def create_enum(
     Returns:
         JSON with the created ctype, fconst list, and any errors.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
 
     ctype_name = f"{namespace}.{name}"
     pkey_name = _camel_to_snake(name)
@@ -850,7 +1156,7 @@ def create_enum(
     errors: list[dict] = []
     for val in values:
         fconst_key = f"{field_name}/{val}"
-        line = f'dmmeta.fconst  fconst:{fconst_key}  value:"{val}"  comment:""'
+        line = _FCONST_TMPL.format(fconst_key, val, "")
         r = client.acr_insert(line)
         if r.ok:
             created.append(fconst_key)
@@ -866,7 +1172,8 @@ def create_enum(
     })
 
 
-@server.tool()
+@_tool
+@_mutating
 def delete_record(pattern: str) -> str:
     """Delete ssim records matching a pattern.
 
@@ -876,14 +1183,13 @@ def delete_record(pattern: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_ed_delete(pattern)
-    return _json(result.to_dict())
+    return _json_compact(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def rename_record(old: str, new: str) -> str:
     """Rename a record, propagating references.
 
@@ -894,14 +1200,13 @@ def rename_record(old: str, new: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_ed_rename(old, new)
-    return _json(result.to_dict())
+    return _json_compact(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_finput(target: str, ssimfile: str, indexed: bool = False) -> str:
     """Add an in-memory table to an exe target, loaded from an ssimfile at startup.
 
@@ -917,9 +1222,7 @@ def create_finput(target: str, ssimfile: str, indexed: bool = False) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     args = ["-finput", "-target", target, "-ssimfile", ssimfile]
     if indexed:
         args.append("-indexed")
@@ -927,7 +1230,8 @@ def create_finput(target: str, ssimfile: str, indexed: bool = False) -> str:
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_gstatic(target: str, ssimfile: str) -> str:
     """Add a compile-time static table to a target, baked into the binary.
 
@@ -943,15 +1247,14 @@ def create_gstatic(target: str, ssimfile: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     args = ["-gstatic", "-target", target, "-ssimfile", ssimfile]
     result = client.acr_ed_create(args)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_substr_field(
     ctype: str,
     name: str,
@@ -982,9 +1285,7 @@ def create_substr_field(
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     args = [
         "-field", f"{ctype}.{name}",
         "-substr", expr,
@@ -996,7 +1297,8 @@ def create_substr_field(
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_bitfield(
     ctype: str,
     name: str,
@@ -1022,9 +1324,7 @@ def create_bitfield(
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
 
     field_name = f"{ctype}.{name}"
 
@@ -1067,7 +1367,7 @@ def create_bitfield(
     return _json({"ok": True, "field": field_name, "offset": offset, "width": width})
 
 
-@server.tool()
+@_tool
 def validate_schema(pattern: str = "%") -> str:
     """Run cross-reference and referential integrity checks on the schema.
 
@@ -1082,9 +1382,7 @@ def validate_schema(pattern: str = "%") -> str:
     Returns:
         JSON with check results: ok=true if no errors, or a list of error records.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_check(pattern)
     if result.ok:
         return _json({"ok": True, "message": "Schema validation passed", "pattern": pattern})
@@ -1102,7 +1400,8 @@ def validate_schema(pattern: str = "%") -> str:
     })
 
 
-@server.tool()
+@_tool
+@_mutating
 def delete_ctype(ctype: str) -> str:
     """Delete a ctype and all its associated records (fields, ssimfile, cfmt, etc.).
 
@@ -1115,14 +1414,13 @@ def delete_ctype(ctype: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_ed_delete_ctype(ctype)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def delete_field(field: str) -> str:
     """Delete a field and its associated records (fconsts, xrefs, etc.).
 
@@ -1134,14 +1432,13 @@ def delete_field(field: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_ed_delete_field(field)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def delete_target(target: str) -> str:
     """Delete a target (namespace) and all its associated records.
 
@@ -1155,14 +1452,13 @@ def delete_target(target: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_ed_delete_target(target)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_srcfile(target: str, path: str, comment: str = "") -> str:
     """Create a new source file and register it with a build target.
 
@@ -1177,14 +1473,13 @@ def create_srcfile(target: str, path: str, comment: str = "") -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_ed_create_srcfile(path, target)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_unittest(target: str, funcname: str, comment: str = "") -> str:
     """Create a unit test function scaffold.
 
@@ -1199,15 +1494,14 @@ def create_unittest(target: str, funcname: str, comment: str = "") -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     test_name = f"{target}.{funcname}"
     result = client.acr_ed_create_unittest(test_name, comment)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def update_record(line: str) -> str:
     """Update or insert a record (upsert) via ``acr -merge -write``.
 
@@ -1221,14 +1515,13 @@ def update_record(line: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_merge(line)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_foutput(target: str, ssimfile: str) -> str:
     """Declare that an exe target writes to an ssimfile (output table).
 
@@ -1241,15 +1534,14 @@ def create_foutput(target: str, ssimfile: str) -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     args = ["-target", target, "-ssimfile", ssimfile]
     result = client.acr_ed_create_foutput(args)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_citest(target: str, testname: str, comment: str = "") -> str:
     """Create a CI (integration) test scaffold.
 
@@ -1264,14 +1556,13 @@ def create_citest(target: str, testname: str, comment: str = "") -> str:
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     result = client.acr_ed_create_citest(testname, comment)
     return _json(result.to_dict())
 
 
-@server.tool()
+@_tool
+@_mutating
 def create_cppfunc(
     ctype: str,
     name: str,
@@ -1294,9 +1585,7 @@ def create_cppfunc(
     Returns:
         JSON with success status or error.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     args = [
         "-field", f"{ctype}.{name}",
         "-arg", arg,
@@ -1310,7 +1599,8 @@ def create_cppfunc(
 
 # ===== Group 3: Code Generation & Discovery ===============================
 
-@server.tool()
+@_tool
+@_mutating
 def run_amc(namespace: str = "") -> str:
     """Run AMC to generate C++ code from the ssim schema.
 
@@ -1320,18 +1610,63 @@ def run_amc(namespace: str = "") -> str:
     Returns:
         JSON with success status and stderr output.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    result = client.amc(namespace)
-    return _json({
+    client = _require_client()
+    result = client.amc(namespace, max_output=2000)
+    if result.ok and not namespace and client.work_dir in _amc_pending:
+        _amc_pending.remove(client.work_dir)
+    return _json_compact({
         "ok": result.ok,
-        "stdout": result.stdout[:2000] if result.stdout else "",
-        "stderr": result.stderr[:2000] if result.stderr else "",
+        "stdout": result.stdout,
+        "stderr": result.stderr,
     })
 
 
-@server.tool()
+@_tool
+@_mutating
+def flush_amc() -> str:
+    """Run AMC in every tree where an earlier create_ctype deferred it.
+
+    Trees left behind by set_project are regenerated too; the active
+    work_dir is restored afterwards. A failing tree does not stop the
+    others and stays pending; trees whose directory no longer exists are
+    dropped.
+
+    Returns:
+        JSON with overall success, whether amc ran, and a per-tree list of
+        work_dir with its ok flag and output (or the reason it was skipped).
+    """
+    client = _require_client()
+    if not _amc_pending:
+        return _json_compact({"ok": True, "ran": False})
+    current = client.work_dir
+    ok = True
+    trees: list[dict[str, Any]] = []
+    try:
+        for work_dir in list(_amc_pending):
+            if not work_dir.is_dir():
+                _amc_pending.remove(work_dir)
+                trees.append({"work_dir": str(work_dir), "skipped": "directory no longer exists"})
+                continue
+            if client.work_dir != work_dir:
+                client.work_dir = work_dir
+            result = client.amc(max_output=2000)
+            trees.append({
+                "work_dir": str(work_dir),
+                "ok": result.ok,
+                "stdout": result.stdout,
+                "stderr": result.stderr,
+            })
+            if result.ok:
+                _amc_pending.remove(work_dir)
+            else:
+                ok = False
+    finally:
+        if client.work_dir != current:
+            client.work_dir = current
+    return _json_compact({"ok": ok, "ran": True, "trees": trees})
+
+
+@_tool
 def run_abt(target: str) -> str:
     """Build/compile a target using abt.
 
@@ -1341,18 +1676,17 @@ def run_abt(target: str) -> str:
     Returns:
         JSON with success status and build output.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    result = client.abt(target)
-    return _json({
+    client = _require_client()
+    with _mut_lock:
+        result = client.abt(target, max_output=5000)
+    return _json_compact({
         "ok": result.ok,
-        "stdout": result.stdout[:5000] if result.stdout else "",
-        "stderr": result.stderr[:5000] if result.stderr else "",
+        "stdout": result.stdout,
+        "stderr": result.stderr,
     })
 
 
-@server.tool()
+@_tool
 def list_generated_headers(namespace: str) -> str:
     """List generated .h files for a namespace.
 
@@ -1362,15 +1696,13 @@ def list_generated_headers(namespace: str) -> str:
     Returns:
         JSON list of header file paths (relative to openacr dir).
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    headers = client.list_generated_headers(namespace)
+    client = _require_client()
+    headers = _cached_headers(client, namespace)
     relative = [str(h.relative_to(client.work_dir)) for h in headers]
-    return _json({"namespace": namespace, "headers": relative, "count": len(relative)})
+    return _json_compact({"namespace": namespace, "headers": relative, "count": len(relative)})
 
 
-@server.tool()
+@_tool
 def get_generated_code(header_path: str) -> str:
     """Return the contents of a generated header file.
 
@@ -1380,24 +1712,23 @@ def get_generated_code(header_path: str) -> str:
     Returns:
         JSON with the file contents (truncated to 50KB).
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
     try:
-        code = client.get_generated_code(header_path)
-        if len(code) > 50000:
-            return _json({
-                "path": header_path,
-                "truncated": True,
-                "total_bytes": len(code),
-                "content": code[:50000],
-            })
-        return _json({"path": header_path, "content": code})
+        head, total_bytes = client.get_generated_code_head(header_path, 50000)
     except FileNotFoundError as e:
         return _error(str(e))
-
-
-@server.tool()
+    code = head.decode("utf-8", errors="replace")
+    if total_bytes is not None:
+        return _json({
+            "path": header_path,
+            "truncated": True,
+            "total_bytes": total_bytes,
+            "content": code,
+        })
+    return _json({"path": header_path, "content": code})
+
+
+@_tool
 def get_functions(namespace: str) -> str:
     """Parse generated headers for a namespace and extract structs, enums, and function signatures.
 
@@ -1407,64 +1738,258 @@ def get_functions(namespace: str) -> str:
     Returns:
         JSON with extracted enums, structs, and functions from generated headers.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
-    headers = client.list_generated_headers(namespace)
+    client = _require_client()
+    headers = _cached_headers(client, namespace)
     if not headers:
         return _error(f"No generated headers found for namespace '{namespace}'")
 
-    combined: dict[str, Any] = {
-        "namespace": namespace,
-        "headers_parsed": [],
-        "total_enums": 0,
-        "total_structs": 0,
-        "total_functions": 0,
-        "enums": [],
-        "structs": [],
-        "functions": [],
-    }
+    # Parse headers concurrently; map() preserves the input order.
+    with ThreadPoolExecutor(max_workers=min(8, len(headers))) as ex:
+        parsed_list = list(ex.map(_parse_cached, headers))
 
-    for header_path in headers:
-        parsed = parse_header_file(header_path)
+    headers_parsed: list[str] = []
+    enums: list[dict[str, Any]] = []
+    structs: list[dict[str, Any]] = []
+    functions: list[dict[str, Any]] = []
+    for header_path, parsed in zip(headers, parsed_list):
         rel_path = str(header_path.relative_to(client.work_dir))
-        combined["headers_parsed"].append(rel_path)
-        combined["total_enums"] += len(parsed.enums)
-        combined["total_structs"] += len(parsed.structs)
-        combined["total_functions"] += len(parsed.functions)
-
-        for e in parsed.enums:
-            combined["enums"].append({
-                "name": e.name,
-                "ctype": e.ctype,
-                "value_count": len(e.values),
-                "header": rel_path,
-            })
-        for s in parsed.structs:
-            combined["structs"].append({
+        headers_parsed.append(rel_path)
+        enums.extend([
+            {"name": e.name, "ctype": e.ctype, "value_count": len(e.values), "header": rel_path}
+            for e in parsed.enums
+        ])
+        structs.extend([
+            {
                 "name": s.name,
                 "ctype": s.ctype,
                 "comment": s.comment,
                 "field_count": len(s.fields),
                 "member_function_count": len(s.member_functions),
                 "header": rel_path,
-            })
-        for f in parsed.functions:
-            combined["functions"].append({
+            }
+            for s in parsed.structs
+        ])
+        functions.extend([
+            {
                 "func_tag": f.func_tag,
                 "return_type": f.return_type,
                 "name": f.name,
                 "params": f.params,
                 "comment": f.comment,
                 "header": rel_path,
-            })
+            }
+            for f in parsed.functions
+        ])
 
+    combined: dict[str, Any] = {
+        "namespace": namespace,
+        "headers_parsed": headers_parsed,
+        "total_enums": len(enums),
+        "total_structs": len(structs),
+        "total_functions": len(functions),
+        "enums": enums,
+        "structs": structs,
+        "functions": functions,
+    }
     return _json(combined)
 
 
 # ===== Group 4: Workflow Guide =============================================
 
-@server.tool()
+_WORKFLOW_GUIDE: dict[str, Any] = {
+    "workflows": [
+        {
+            "title": "Create a new ssimdb with types",
+            "steps": [
+                "1. create_target(name='mydb', nstype='ssimdb', comment='My database')",
+                "2. create_ctype(namespace='mydb', name='MyRecord', comment='A record type')",
+                "   — This creates the ctype. The pkey field and ssimfile record are auto-created.",
+                "3. create_field(ctype='mydb.MyRecord', name='name', arg='algo.cstring', reftype='Val', comment='Record name')",
+                "4. create_field(ctype='mydb.MyRecord', name='count', arg='u32', reftype='Val', dflt='0', comment='Counter')",
+                "5. run_amc() — generates C++ code",
+                "6. get_functions(namespace='mydb') — discover the generated API",
+            ],
+        },
+        {
+            "title": "Add an enum type",
+            "steps": [
+                "1. create_ctype(namespace='mydb', name='Status', comment='Record status')",
+                "   — Creates mydb.Status ctype with auto-generated pkey field and ssimfile",
+                "2. create_fconst(field='mydb.Status.status', value='pending', comment='Not started')",
+                "3. create_fconst(field='mydb.Status.status', value='active', comment='In progress')",
+                "4. create_fconst(field='mydb.Status.status', value='done', comment='Completed')",
+                "5. run_amc() — generates C++ enum class Status { pending, active, done }",
+            ],
+            "notes": "The pkey field name is auto-derived as lowercase of the type name. "
+                     "For mydb.Status, the pkey field is 'mydb.Status.status'.",
+        },
+        {
+            "title": "Create a struct with foreign key references",
+            "steps": [
+                "1. First create the referenced types (see 'Add an enum type')",
+                "2. create_ctype(namespace='mydb', name='Task', comment='A task')",
+                "3. create_field(ctype='mydb.Task', name='title', arg='algo.cstring', reftype='Val')",
+                "4. create_field(ctype='mydb.Task', name='status', arg='mydb.Status', reftype='Pkey', comment='Task status')",
+                "   — reftype='Pkey' creates a foreign key to mydb.Status",
+                "5. run_amc()",
+            ],
+        },
+        {
+            "title": "Create an exe that uses a ssimdb",
+            "steps": [
+                "1. create_target(name='myapp', nstype='exe', comment='My application')",
+                "2. The exe needs an FDb (global database) — it's auto-created",
+                "3. Add finput for each ssimfile the exe needs to load at runtime:",
+                "   create_finput(target='myapp', ssimfile='mydb.my_table', indexed=True)",
+                "   — indexed=True adds a Thash hash index for O(1) key lookup",
+                "4. run_amc() then run_abt(target='myapp') to build",
+            ],
+        },
+        {
+            "title": "Load reference data at compile time (gstatic)",
+            "steps": [
+                "1. Create your reference data ssimdb: create_target('refdb', 'ssimdb')",
+                "2. Add types and populate data files in data/refdb/*.ssim",
+                "3. In your exe, use gstatic instead of finput:",
+                "   create_gstatic(target='myapp', ssimfile='refdb.country')",
+                "   — Data is compiled INTO the binary. No disk I/O at startup.",
+                "   — The table is read-only and immutable at runtime.",
+                "4. Use finput for mutable data that changes between runs,",
+                "   gstatic for immutable reference data (currencies, countries, etc.)",
+            ],
+        },
+        {
+            "title": "Create a composite key (junction table)",
+            "steps": [
+                "1. Create the junction ctype with a composite pkey:",
+                "   create_ctype('mydb', 'MovieCast', 'Movie-actor association')",
+                "   — pkey field 'movie_cast' stores 'movie/actor' composite",
+                "2. Add substr fields to extract each component:",
+                "   create_substr_field('mydb.MovieCast', 'movie', '.LL', 'mydb.MovieCast.movie_cast')",
+                "   create_substr_field('mydb.MovieCast', 'actor', '.LR', 'mydb.MovieCast.movie_cast')",
+                "   — .LL = left of '/', .LR = right of '/'",
+                "3. Add data fields: create_field('mydb.MovieCast', 'role_name', 'algo.cstring', 'Val')",
+                "4. Separator defaults to '/' for composite keys",
+            ],
+        },
+        {
+            "title": "Create a bitfield-packed struct",
+            "steps": [
+                "1. Create the ctype: create_ctype('myproto', 'Header', 'Protocol header')",
+                "2. Add the integer field that holds the bits:",
+                "   create_field('myproto.Header', 'flags', 'u32', 'Val')",
+                "3. Add bitfields packed into it:",
+                "   create_bitfield('myproto.Header', 'version', 'u8', 'myproto.Header.flags', width=4)",
+                "   create_bitfield('myproto.Header', 'type', 'u8', 'myproto.Header.flags', width=4)",
+                "4. run_amc() — generates accessors: version_Get(hdr), version_Set(hdr, val)",
+            ],
+        },
+        {
+            "title": "Add indexed access paths to an exe (Thash/Bheap)",
+            "steps": [
+                "1. After create_finput, add indexed fields with xref:",
+                "   create_field('myapp.FDb', 'ind_order', 'myapp.Order', 'Thash',",
+                "     xref=True, hashfld='myapp.Order.order', via='myapp.Order/order')",
+                "   — Creates a hash table indexed by order pkey",
+                "2. For sorted access (priority queue):",
+                "   create_field('myapp.FDb', 'bh_order', 'myapp.Order', 'Bheap',",
+                "     xref=True, sortfld='myapp.Order.price')",
+                "3. run_amc() — generates: ind_order_Find(key), bh_order_First()",
+            ],
+        },
+        {
+            "title": "Validate schema integrity",
+            "steps": [
+                "1. After making schema changes, always validate:",
+                "   validate_schema() — checks ALL referential integrity",
+                "   validate_schema('dmmeta.ctype:myns.%') — check one namespace",
+                "2. Common errors: broken FK refs, missing ssimfiles, dangling records",
+                "3. Fix any errors before running amc",
+            ],
+        },
+        {
+            "title": "Explore an existing namespace",
+            "steps": [
+                "1. list_ssimfiles('dev') — see all data tables",
+                "2. list_fconsts('dev') — see all enum constants",
+                "3. list_finputs('acr') — see what tables acr loads at runtime",
+                "4. get_downstream('dmmeta.ctype:dev.Builddir', levels=2) — see fields and fconsts",
+                "5. get_upstream('dmmeta.field:dev.Builddir.builddir', levels=1) — see parent ctype",
+            ],
+        },
+        {
+            "title": "Delete and rebuild a ctype",
+            "steps": [
+                "1. delete_ctype('myns.OldType') — cascades to fields, ssimfile, cfmt",
+                "2. Or delete just a field: delete_field('myns.MyType.old_field')",
+                "3. Or remove an entire namespace: delete_target('myns')",
+                "4. run_amc() — regenerate code after deletion",
+                "Note: Use delete_ctype/field/target instead of raw delete_record",
+                "      — they handle cascade properly via acr_ed.",
+            ],
+        },
+        {
+            "title": "Scaffold source files and tests",
+            "steps": [
+                "1. create_srcfile(target='myapp', path='cpp/myapp/utils.cpp')",
+                "   — Creates the file and registers it with abt",
+                "2. create_unittest(target='atf_ut', funcname='myapp.TestAdd')",
+                "   — Scaffolds a test function in the target's test source",
+                "3. run_abt(target='myapp') — build to verify",
+            ],
+        },
+    ],
+    "arg_types_reference": {
+        "strings": {
+            "algo.cstring": "Variable-length string (heap-allocated)",
+            "algo.Smallstr10": "Fixed-capacity 10-char string (stack-allocated)",
+            "algo.Smallstr20": "Fixed-capacity 20-char string",
+            "algo.Smallstr50": "Fixed-capacity 50-char string",
+            "algo.Smallstr100": "Fixed-capacity 100-char string",
+            "algo.Smallstr150": "Fixed-capacity 150-char string",
+            "algo.Smallstr200": "Fixed-capacity 200-char string",
+            "algo.Comment": "Comment/description string",
+        },
+        "integers": {
+            "u8": "Unsigned 8-bit integer",
+            "u16": "Unsigned 16-bit integer",
+            "u32": "Unsigned 32-bit integer",
+            "u64": "Unsigned 64-bit integer",
+            "i8": "Signed 8-bit integer",
+            "i16": "Signed 16-bit integer",
+            "i32": "Signed 32-bit integer",
+            "i64": "Signed 64-bit integer",
+        },
+        "other": {
+            "bool": "Boolean",
+            "float": "32-bit float",
+            "double": "64-bit float",
+            "algo.UnTime": "Timestamp (Unix time in microseconds)",
+            "algo.UnDiff": "Time difference (microseconds)",
+        },
+    },
+    "reftype_reference": {
+        "Val": "Inline value — the field stores the data directly in the struct",
+        "Pkey": "Foreign key — references another ctype's primary key. "
+                "Generated code includes lookup functions and referential integrity",
+        "Base": "Inheritance — this ctype extends the arg ctype. "
+                "Fields from the base type are included in the derived type",
+        "Thash": "Hash table — stores a collection of records indexed by pkey. "
+                 "Used in FDb (global database) types for in-memory tables",
+        "Lary": "Level array — growable array with O(1) random access. "
+                "Used for collections that grow but never shrink",
+        "Tary": "Tight array — standard growable array (like std::vector)",
+        "Llist": "Linked list — intrusive doubly-linked list",
+        "Count": "Count of linked records (no storage, just bookkeeping)",
+        "Upptr": "Up-pointer — cached pointer to parent record for fast traversal",
+    },
+}
+
+# The guide never changes, so serialize it once at import time.
+_WORKFLOW_GUIDE_JSON = _json(_WORKFLOW_GUIDE)
+
+
+@_tool
 def get_workflow_guide() -> str:
     """Get detailed step-by-step examples for common OpenACR workflows.
 
@@ -1472,200 +1997,12 @@ def get_workflow_guide() -> str:
         JSON with workflow guides for creating ssimdb namespaces, enum types,
         structs with FK relationships, and building executables.
     """
-    guide = {
-        "workflows": [
-            {
-                "title": "Create a new ssimdb with types",
-                "steps": [
-                    "1. create_target(name='mydb', nstype='ssimdb', comment='My database')",
-                    "2. create_ctype(namespace='mydb', name='MyRecord', comment='A record type')",
-                    "   — This creates the ctype. The pkey field and ssimfile record are auto-created.",
-                    "3. create_field(ctype='mydb.MyRecord', name='name', arg='algo.cstring', reftype='Val', comment='Record name')",
-                    "4. create_field(ctype='mydb.MyRecord', name='count', arg='u32', reftype='Val', dflt='0', comment='Counter')",
-                    "5. run_amc() — generates C++ code",
-                    "6. get_functions(namespace='mydb') — discover the generated API",
-                ],
-            },
-            {
-                "title": "Add an enum type",
-                "steps": [
-                    "1. create_ctype(namespace='mydb', name='Status', comment='Record status')",
-                    "   — Creates mydb.Status ctype with auto-generated pkey field and ssimfile",
-                    "2. create_fconst(field='mydb.Status.status', value='pending', comment='Not started')",
-                    "3. create_fconst(field='mydb.Status.status', value='active', comment='In progress')",
-                    "4. create_fconst(field='mydb.Status.status', value='done', comment='Completed')",
-                    "5. run_amc() — generates C++ enum class Status { pending, active, done }",
-                ],
-                "notes": "The pkey field name is auto-derived as lowercase of the type name. "
-                         "For mydb.Status, the pkey field is 'mydb.Status.status'.",
-            },
-            {
-                "title": "Create a struct with foreign key references",
-                "steps": [
-                    "1. First create the referenced types (see 'Add an enum type')",
-                    "2. create_ctype(namespace='mydb', name='Task', comment='A task')",
-                    "3. create_field(ctype='mydb.Task', name='title', arg='algo.cstring', reftype='Val')",
-                    "4. create_field(ctype='mydb.Task', name='status', arg='mydb.Status', reftype='Pkey', comment='Task status')",
-                    "   — reftype='Pkey' creates a foreign key to mydb.Status",
-                    "5. run_amc()",
-                ],
-            },
-            {
-                "title": "Create an exe that uses a ssimdb",
-                "steps": [
-                    "1. create_target(name='myapp', nstype='exe', comment='My application')",
-                    "2. The exe needs an FDb (global database) — it's auto-created",
-                    "3. Add finput for each ssimfile the exe needs to load at runtime:",
-                    "   create_finput(target='myapp', ssimfile='mydb.my_table', indexed=True)",
-                    "   — indexed=True adds a Thash hash index for O(1) key lookup",
-                    "4. run_amc() then run_abt(target='myapp') to build",
-                ],
-            },
-            {
-                "title": "Load reference data at compile time (gstatic)",
-                "steps": [
-                    "1. Create your reference data ssimdb: create_target('refdb', 'ssimdb')",
-                    "2. Add types and populate data files in data/refdb/*.ssim",
-                    "3. In your exe, use gstatic instead of finput:",
-                    "   create_gstatic(target='myapp', ssimfile='refdb.country')",
-                    "   — Data is compiled INTO the binary. No disk I/O at startup.",
-                    "   — The table is read-only and immutable at runtime.",
-                    "4. Use finput for mutable data that changes between runs,",
-                    "   gstatic for immutable reference data (currencies, countries, etc.)",
-                ],
-            },
-            {
-                "title": "Create a composite key (junction table)",
-                "steps": [
-                    "1. Create the junction ctype with a composite pkey:",
-                    "   create_ctype('mydb', 'MovieCast', 'Movie-actor association')",
-                    "   — pkey field 'movie_cast' stores 'movie/actor' composite",
-                    "2. Add substr fields to extract each component:",
-                    "   create_substr_field('mydb.MovieCast', 'movie', '.LL', 'mydb.MovieCast.movie_cast')",
-                    "   create_substr_field('mydb.MovieCast', 'actor', '.LR', 'mydb.MovieCast.movie_cast')",
-                    "   — .LL = left of '/', .LR = right of '/'",
-                    "3. Add data fields: create_field('mydb.MovieCast', 'role_name', 'algo.cstring', 'Val')",
-                    "4. Separator defaults to '/' for composite keys",
-                ],
-            },
-            {
-                "title": "Create a bitfield-packed struct",
-                "steps": [
-                    "1. Create the ctype: create_ctype('myproto', 'Header', 'Protocol header')",
-                    "2. Add the integer field that holds the bits:",
-                    "   create_field('myproto.Header', 'flags', 'u32', 'Val')",
-                    "3. Add bitfields packed into it:",
-                    "   create_bitfield('myproto.Header', 'version', 'u8', 'myproto.Header.flags', width=4)",
-                    "   create_bitfield('myproto.Header', 'type', 'u8', 'myproto.Header.flags', width=4)",
-                    "4. run_amc() — generates accessors: version_Get(hdr), version_Set(hdr, val)",
-                ],
-            },
-            {
-                "title": "Add indexed access paths to an exe (Thash/Bheap)",
-                "steps": [
-                    "1. After create_finput, add indexed fields with xref:",
-                    "   create_field('myapp.FDb', 'ind_order', 'myapp.Order', 'Thash',",
-                    "     xref=True, hashfld='myapp.Order.order', via='myapp.Order/order')",
-                    "   — Creates a hash table indexed by order pkey",
-                    "2. For sorted access (priority queue):",
-                    "   create_field('myapp.FDb', 'bh_order', 'myapp.Order', 'Bheap',",
-                    "     xref=True, sortfld='myapp.Order.price')",
-                    "3. run_amc() — generates: ind_order_Find(key), bh_order_First()",
-                ],
-            },
-            {
-                "title": "Validate schema integrity",
-                "steps": [
-                    "1. After making schema changes, always validate:",
-                    "   validate_schema() — checks ALL referential integrity",
-                    "   validate_schema('dmmeta.ctype:myns.%') — check one namespace",
-                    "2. Common errors: broken FK refs, missing ssimfiles, dangling records",
-                    "3. Fix any errors before running amc",
-                ],
-            },
-            {
-                "title": "Explore an existing namespace",
-                "steps": [
-                    "1. list_ssimfiles('dev') — see all data tables",
-                    "2. list_fconsts('dev') — see all enum constants",
-                    "3. list_finputs('acr') — see what tables acr loads at runtime",
-                    "4. get_downstream('dmmeta.ctype:dev.Builddir', levels=2) — see fields and fconsts",
-                    "5. get_upstream('dmmeta.field:dev.Builddir.builddir', levels=1) — see parent ctype",
-                ],
-            },
-            {
-                "title": "Delete and rebuild a ctype",
-                "steps": [
-                    "1. delete_ctype('myns.OldType') — cascades to fields, ssimfile, cfmt",
-                    "2. Or delete just a field: delete_field('myns.MyType.old_field')",
-                    "3. Or remove an entire namespace: delete_target('myns')",
-                    "4. run_amc() — regenerate code after deletion",
-                    "Note: Use delete_ctype/field/target instead of raw delete_record",
-                    "      — they handle cascade properly via acr_ed.",
-                ],
-            },
-            {
-                "title": "Scaffold source files and tests",
-                "steps": [
-                    "1. create_srcfile(target='myapp', path='cpp/myapp/utils.cpp')",
-                    "   — Creates the file and registers it with abt",
-                    "2. create_unittest(target='atf_ut', funcname='myapp.TestAdd')",
-                    "   — Scaffolds a test function in the target's test source",
-                    "3. run_abt(target='myapp') — build to verify",
-                ],
-            },
-        ],
-        "arg_types_reference": {
-            "strings": {
-                "algo.cstring": "Variable-length string (heap-allocated)",
-                "algo.Smallstr10": "Fixed-capacity 10-char string (stack-allocated)",
-                "algo.Smallstr20": "Fixed-capacity 20-char string",
-                "algo.Smallstr50": "Fixed-capacity 50-char string",
-                "algo.Smallstr100": "Fixed-capacity 100-char string",
-                "algo.Smallstr150": "Fixed-capacity 150-char string",
-                "algo.Smallstr200": "Fixed-capacity 200-char string",
-                "algo.Comment": "Comment/description string",
-            },
-            "integers": {
-                "u8": "Unsigned 8-bit integer",
-                "u16": "Unsigned 16-bit integer",
-                "u32": "Unsigned 32-bit integer",
-                "u64": "Unsigned 64-bit integer",
-                "i8": "Signed 8-bit integer",
-                "i16": "Signed 16-bit integer",
-                "i32": "Signed 32-bit integer",
-                "i64": "Signed 64-bit integer",
-            },
-            "other": {
-                "bool": "Boolean",
-                "float": "32-bit float",
-                "double": "64-bit float",
-                "algo.UnTime": "Timestamp (Unix time in microseconds)",
-                "algo.UnDiff": "Time difference (microseconds)",
-            },
-        },
-        "reftype_reference": {
-            "Val": "Inline value — the field stores the data directly in the struct",
-            "Pkey": "Foreign key — references another ctype's primary key. "
-                    "Generated code includes lookup functions and referential integrity",
-            "Base": "Inheritance — this ctype extends the arg ctype. "
-                    "Fields from the base type are included in the derived type",
-            "Thash": "Hash table — stores a collection of records indexed by pkey. "
-                     "Used in FDb (global database) types for in-memory tables",
-            "Lary": "Level array — growable array with O(1) random access. "
-                    "Used for collections that grow but never shrink",
-            "Tary": "Tight array — standard growable array (like std::vector)",
-            "Llist": "Linked list — intrusive doubly-linked list",
-            "Count": "Count of linked records (no storage, just bookkeeping)",
-            "Upptr": "Up-pointer — cached pointer to parent record for fast traversal",
-        },
-    }
-    return _json(guide)
+    return _WORKFLOW_GUIDE_JSON
 
 
 # ===== Group 5: Usage Examples =============================================
 
-@server.tool()
+@_tool
 def get_usage_examples(namespace: str) -> str:
     """Generate C++ usage examples for a namespace's generated types.
 
@@ -1679,15 +2016,29 @@ def get_usage_examples(namespace: str) -> str:
     Returns:
         JSON with include directive, and per-type usage examples.
     """
-    client = _client_or_error()
-    if isinstance(client, str):
-        return client
+    client = _require_client()
 
     # Gather schema info
     ctypes_result = client.list_ctypes(namespace)
     if not ctypes_result.ok or not ctypes_result.records:
         return _error(f"No ctypes found for namespace '{namespace}'")
 
+    # Fetch every field and fconst in the namespace once and group them
+    # locally instead of issuing two acr queries per ctype.
+    fields_by_ctype: dict[str, list[dict[str, str]]] = {}
+    all_fields = client.acr(f"dmmeta.field:{namespace}.%")
+    if all_fields.ok:
+        for rec in all_fields.records:
+            owner = rec.get("field", "").rpartition(".")[0]
+            fields_by_ctype.setdefault(owner, []).append(rec)
+
+    fconsts_by_field: dict[str, list[dict[str, str]]] = {}
+    all_fconsts = client.acr(f"dmmeta.fconst:{namespace}.%")
+    if all_fconsts.ok:
+        for rec in all_fconsts.records:
+            owner = rec.get("fconst", "").partition("/")[0]
+            fconsts_by_field.setdefault(owner, []).append(rec)
+
     examples: dict[str, Any] = {
         "namespace": namespace,
         "include": f'#include "include/gen/{namespace}_gen.h"',
@@ -1700,20 +2051,21 @@ def get_usage_examples(namespace: str) -> str:
         if "." not in ctype_name:
             continue
         ns, type_name = ctype_name.split(".", 1)
+        # These identifiers recur in every snippet below; intern them once.
+        ns = sys.intern(ns)
+        type_name = sys.intern(type_name)
 
         # Skip internal helper types
-        if type_name in ("FieldId",) or type_name.endswith("Case"):
+        if type_name in _INTERNAL_TYPES or type_name.endswith("Case"):
             continue
 
         # Get fields
-        fields_result = client.list_fields(ctype_name)
-        fields = fields_result.records if fields_result.ok else []
+        fields = fields_by_ctype.get(ctype_name, [])
 
         # Check for fconsts (enum type)
         pkey_field = fields[0] if fields else None
         pkey_field_name = pkey_field.get("field", "") if pkey_field else ""
-        fconst_result = client.acr(f"dmmeta.fconst:{pkey_field_name}/%")
-        fconsts = fconst_result.records if fconst_result.ok else []
+        fconsts = fconsts_by_field.get(pkey_field_name, [])
         is_enum = len(fconsts) > 0
 
         # Get non-pkey fields (the actual data fields)
@@ -1727,9 +2079,10 @@ def get_usage_examples(namespace: str) -> str:
             "code": [],
         }
 
+        snake = sys.intern(_camel_to_snake(type_name))
+
         if is_enum:
             # --- Enum usage examples ---
-            snake = _camel_to_snake(type_name)
             fconst_values = [r.get("value", "") for r in fconsts]
             fconst_comments = [r.get("comment", "") for r in fconsts]
 
@@ -1777,75 +2130,23 @@ def get_usage_examples(namespace: str) -> str:
                     "cpp": (
                         f"{ns}::{type_name}Case val({ns}_{type_name}Case_{first_val});\n"
                         f"switch ({snake}_GetEnum(val)) {{\n"
-                        + "".join(
-                            f"    case {ns}_{type_name}Case_{v}:  // {c}\n"
-                            f"        break;\n"
+                        + "\n".join(
+                            f"    case {ns}_{type_name}Case_{v}:  // {c}\n        break;"
                             for v, c in zip(fconst_values, fconst_comments)
                         )
-                        + f"    default: break;\n"
-                        f"}}"
+                        + "\n    default: break;\n}"
                     ),
                 },
             ]
 
         else:
             # --- Struct usage examples ---
-            snake = _camel_to_snake(type_name)
             pkey_name = snake  # first field name
 
             # Build field assignment lines
-            assign_lines = []
-            for f in data_fields:
-                fname = f.get("field", "").rsplit(".", 1)[-1]
-                arg = f.get("arg", "")
-                reftype = f.get("reftype", "")
-                fcomment = f.get("comment", "")
-                dflt = f.get("dflt", "")
-
-                if reftype == "Pkey":
-                    # FK field — set as string
-                    ref_type = arg.rsplit(".", 1)[-1] if "." in arg else arg
-                    assign_lines.append(
-                        f'rec.{fname} = "some_{_camel_to_snake(ref_type)}";'
-                        f"  // FK to {arg}"
-                    )
-                elif "cstring" in arg or "Smallstr" in arg or "Comment" in arg:
-                    assign_lines.append(
-                        f'rec.{fname} = "example";'
-                        f'  // {fcomment or arg}'
-                    )
-                elif arg in ("u8", "u16", "u32", "u64", "i8", "i16", "i32", "i64"):
-                    val = dflt if dflt else "0"
-                    assign_lines.append(
-                        f"rec.{fname} = {val};"
-                        f"  // {fcomment or arg}"
-                    )
-                elif arg == "bool":
-                    assign_lines.append(
-                        f"rec.{fname} = true;"
-                        f"  // {fcomment or arg}"
-                    )
-                elif arg in ("float", "double"):
-                    assign_lines.append(
-                        f"rec.{fname} = 0.0;"
-                        f"  // {fcomment or arg}"
-                    )
-                else:
-                    assign_lines.append(
-                        f"// rec.{fname} = ...;  // {arg} {fcomment}"
-                    )
-
-            assign_block = "\n".join(assign_lines)
-
-            type_example["fields"] = [
-                {
-                    "name": f.get("field", "").rsplit(".", 1)[-1],
-                    "arg": f.get("arg", ""),
-                    "reftype": f.get("reftype", ""),
-                    "comment": f.get("comment", ""),
-                }
-                for f in fields
-            ]
+            assign_block = "\n".join([_format_field_assign(f) for f in data_fields])
+
+            type_example["fields"] = [_field_summary(f) for f in fields]
 
             type_example["code"] = [
                 {
@@ -1899,16 +2200,14 @@ def main():
         print(f"Error: OpenACR dir not found: {args.openacr_dir}", file=sys.stderr)
         sys.exit(1)
 
-    # Set cwd to openacr dir — this is the standard OpenACR working mode.
-    # AcrClient.__init__ adds bin/ to PATH so all commands are findable by name.
-    os.chdir(args.openacr_dir)
-
+    # AcrClient runs every command with cwd=work_dir and bin/ on PATH, so the
+    # server process itself never changes directory or environment.
     global _client
     _client = AcrClient(args.openacr_dir)
-    print(f"OpenACR MCP server initialized: {args.openacr_dir} (cwd + PATH set)", file=sys.stderr)
+    print(f"OpenACR MCP server initialized: {_client.openacr_dir}", file=sys.stderr)
 
     if args.project:
-        project = Path(args.project).resolve()
+        project = (_client.openacr_dir / args.project).resolve()
         if not (project / "data").exists():
             result = init_project(str(project))
             print(f"init_project: {result}", file=sys.stderr)
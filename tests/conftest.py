@@ -0,0 +1,11 @@
+import pytest
+
+import openacr_mcp.server as srv
+
+
+@pytest.fixture(autouse=True)
+def reset_server_caches():
+    """Keep the server's module-level caches from leaking between tests."""
+    srv._invalidate()
+    yield
+    srv._invalidate()
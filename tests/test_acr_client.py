@@ -1,5 +1,8 @@
 """Tests for acr_client — ssim parser and subprocess wrapper."""
 
+import os
+import time
+
 import pytest
 from pathlib import Path
 
@@ -98,6 +101,126 @@ class TestAcrResult:
         assert "not found" in d["error"]
 
 
+class TestAcrClientEnv:
+    """The client finds bin/ commands without touching process-global state."""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        fake_acr = bin_dir / "acr"
+        fake_acr.write_text('#!/bin/sh\necho "dmmeta.ns  ns:$(basename "$PWD")"\n')
+        fake_acr.chmod(0o755)
+        return AcrClient(tmp_path)
+
+    def test_process_path_untouched(self, client, monkeypatch):
+        monkeypatch.setenv("PATH", "/usr/bin:/bin")
+        fresh = AcrClient(client.openacr_dir)
+        assert os.environ["PATH"] == "/usr/bin:/bin"
+        assert fresh._env["PATH"] == f"{fresh.bin_dir}:/usr/bin:/bin"
+
+    def test_bin_command_runs_in_work_dir(self, client, tmp_path):
+        project = tmp_path / "myproject"
+        project.mkdir()
+        client.work_dir = project
+        result = client.acr("dmmeta.ns:%")
+        assert result.ok
+        assert result.records[0]["ns"] == "myproject"
+
+    def test_bounded_output(self, client):
+        fake_amc = client.bin_dir / "amc"
+        fake_amc.write_text(
+            "#!/bin/sh\n"
+            "i=0; while [ $i -lt 2000 ]; do echo 'report.amc  n_cppfile:0'; i=$((i+1)); done\n"
+            "echo boom-boom-boom >&2\n"
+        )
+        fake_amc.chmod(0o755)
+        result = client.amc(max_output=100)
+        assert result.ok
+        assert len(result.stdout) == 100
+        assert result.stderr == "boom-boom-boom\n"
+        assert client.amc().stdout.count("\n") == 2000
+
+    def _fake(self, client, name, body):
+        script = client.bin_dir / name
+        script.write_text("#!/bin/sh\n" + body)
+        script.chmod(0o755)
+
+    def test_bounded_timeout_kills_grandchildren(self, client):
+        # The background sleep inherits the pipes and outlives its parent
+        self._fake(client, "abt", "sleep 8 &\nsleep 30\n")
+        start = time.monotonic()
+        result = client._run_bounded(["abt", "x"], timeout=1, max_chars=100)
+        assert time.monotonic() - start < 5
+        assert not result.ok
+        assert "timed out" in result.stderr
+
+    def test_bounded_output_tolerates_invalid_utf8(self, client):
+        self._fake(client, "amc", "printf '\\377'\nhead -c 200000 /dev/zero | tr '\\0' x\n")
+        result = client._run_bounded(["amc"], timeout=10, max_chars=100)
+        assert result.ok
+        assert result.stdout == "\ufffd" + "x" * 99
+
+
+class TestGetNsTypeMemo:
+    """get_ns_type memoization, against fake acr / acr_ed commands in bin/."""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        self.log = tmp_path / "acr.log"
+        fake_acr = bin_dir / "acr"
+        fake_acr.write_text(
+            "#!/bin/sh\n"
+            f'echo "$*" >> "{self.log}"\n'
+            'case "$1" in\n'
+            '  dmmeta.ns:mydb) echo "dmmeta.ns  ns:mydb  nstype:ssimdb" ;;\n'
+            "  -merge) cat >/dev/null ;;\n"
+            "esac\n"
+        )
+        fake_acr.chmod(0o755)
+        fake_acr_ed = bin_dir / "acr_ed"
+        fake_acr_ed.write_text("#!/bin/sh\n")
+        fake_acr_ed.chmod(0o755)
+        return AcrClient(tmp_path)
+
+    def _lookups(self):
+        if not self.log.exists():
+            return 0
+        return self.log.read_text().splitlines().count("dmmeta.ns:mydb")
+
+    def test_repeated_lookup_queries_once(self, client):
+        assert client.get_ns_type("mydb") == "ssimdb"
+        assert client.get_ns_type("mydb") == "ssimdb"
+        assert self._lookups() == 1
+
+    def test_missing_namespace_not_memoized(self, client):
+        assert client.get_ns_type("nope") is None
+        assert client.get_ns_type("nope") is None
+        assert self.log.read_text().splitlines() == ["dmmeta.ns:nope"] * 2
+
+    def test_work_dir_change_drops_memo(self, client, tmp_path):
+        client.get_ns_type("mydb")
+        project = tmp_path / "myproject"
+        project.mkdir()
+        client.work_dir = project
+        assert client.get_ns_type("mydb") == "ssimdb"
+        assert self._lookups() == 2
+
+    def test_create_target_drops_memo(self, client):
+        client.get_ns_type("mydb")
+        assert client.acr_ed_create_target("mydb", "ssimdb").ok
+        client.get_ns_type("mydb")
+        assert self._lookups() == 2
+
+    def test_merge_drops_memo(self, client):
+        client.get_ns_type("mydb")
+        assert client.acr_merge("dmmeta.ns  ns:mydb  nstype:exe").ok
+        client.get_ns_type("mydb")
+        assert self._lookups() == 2
+
+
 # ---------------------------------------------------------------------------
 # Integration tests (require ~/openacr)
 # ---------------------------------------------------------------------------
@@ -208,11 +208,16 @@ skip_no_openacr = pytest.mark.skipif(
 )
 
 
+@pytest.fixture(scope="module")
+def algo_gen():
+    """algo_gen.h parsed once and shared by the read-only checks below."""
+    return parse_header_file(OPENACR_DIR / "include" / "gen" / "algo_gen.h")
+
+
 @skip_no_openacr
 class TestParseRealHeaders:
-    def test_algo_gen_h(self):
-        path = OPENACR_DIR / "include" / "gen" / "algo_gen.h"
-        result = parse_header_file(path)
+    def test_algo_gen_h(self, algo_gen):
+        result = algo_gen
         assert result.namespace == "algo"
         assert len(result.enums) > 0
         # algo.Bool enum should be present
@@ -220,17 +225,15 @@ class TestParseRealHeaders:
         assert len(bool_enums) >= 1
         assert len(bool_enums[0].values) > 0
 
-    def test_algo_gen_h_structs(self):
-        path = OPENACR_DIR / "include" / "gen" / "algo_gen.h"
-        result = parse_header_file(path)
+    def test_algo_gen_h_structs(self, algo_gen):
+        result = algo_gen
         assert len(result.structs) > 0
         # cstring struct should be there
         cstring_structs = [s for s in result.structs if s.name == "cstring"]
         assert len(cstring_structs) >= 1
 
-    def test_algo_gen_h_functions(self):
-        path = OPENACR_DIR / "include" / "gen" / "algo_gen.h"
-        result = parse_header_file(path)
+    def test_algo_gen_h_functions(self, algo_gen):
+        result = algo_gen
         assert len(result.functions) > 0
         # Some known functions
         func_names = [f.name for f in result.functions]
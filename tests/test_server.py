@@ -4,6 +4,7 @@ import json
 import os
 import shutil
 import tempfile
+import threading
 from unittest.mock import patch, MagicMock
 import pytest
 from pathlib import Path
@@ -228,17 +229,23 @@ class TestCreateCtypeAutoSsimfile:
     """Unit tests for create_ctype's auto-ssimfile and cfmt behavior."""
 
     @pytest.fixture(autouse=True)
-    def setup_mock_client(self):
+    def setup_mock_client(self, monkeypatch, tmp_path):
+        self.tree_a = tmp_path / "a"
+        self.tree_b = tmp_path / "b"
+        self.tree_a.mkdir()
+        self.tree_b.mkdir()
         mock_client = MagicMock(spec=AcrClient)
+        mock_client.work_dir = self.tree_a
         srv._client = mock_client
         self.mock_client = mock_client
+        monkeypatch.setattr(srv, "_amc_pending", [])
         yield
         srv._client = None
 
     def test_ssimdb_auto_creates_ssimfile_and_cfmt(self):
         self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
         self.mock_client.get_ns_type.return_value = "ssimdb"
-        self.mock_client.acr_insert.return_value = AcrResult(ok=True)
+        self.mock_client.acr_insert_many.return_value = AcrResult(ok=True)
         self.mock_client.amc.return_value = AcrResult(ok=True)
 
         result = json.loads(srv.create_ctype("mydb", "MyRecord", "A record"))
@@ -246,26 +253,100 @@ class TestCreateCtypeAutoSsimfile:
         assert result["ssimfile_auto_created"] is True
         assert result["cfmt_auto_created"] is True
 
-        # Verify both ssimfile and cfmt were inserted
-        calls = self.mock_client.acr_insert.call_args_list
-        assert len(calls) == 2
-        assert "dmmeta.ssimfile  ssimfile:mydb.my_record  ctype:mydb.MyRecord" in calls[0][0][0]
-        assert "dmmeta.cfmt  cfmt:mydb.MyRecord.String" in calls[1][0][0]
-        assert "read:Y" in calls[1][0][0]
-        assert "print:Y" in calls[1][0][0]
-        # Verify amc was re-run
+        # Verify ssimfile and cfmt were inserted in a single acr call
+        self.mock_client.acr_insert_many.assert_called_once()
+        lines = self.mock_client.acr_insert_many.call_args[0][0]
+        assert len(lines) == 2
+        assert "dmmeta.ssimfile  ssimfile:mydb.my_record  ctype:mydb.MyRecord" in lines[0]
+        assert "dmmeta.cfmt  cfmt:mydb.MyRecord.String" in lines[1]
+        assert "read:Y" in lines[1]
+        assert "print:Y" in lines[1]
+        self.mock_client.acr_insert.assert_not_called()
+        # amc is deferred by default
+        assert result["amc_deferred"] is True
+        self.mock_client.amc.assert_not_called()
+        assert srv._amc_pending == [self.tree_a]
+
+    def test_ssimdb_runs_amc_when_not_deferred(self):
+        self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
+        self.mock_client.get_ns_type.return_value = "ssimdb"
+        self.mock_client.acr_insert_many.return_value = AcrResult(ok=True)
+        self.mock_client.amc.return_value = AcrResult(ok=True)
+
+        result = json.loads(srv.create_ctype("mydb", "MyRecord", defer_amc=False))
+        assert result["amc_deferred"] is False
+        self.mock_client.amc.assert_called_once()
+        assert srv._amc_pending == []
+
+    def test_flush_amc_runs_only_when_pending(self):
+        self.mock_client.amc.return_value = AcrResult(ok=True)
+        assert json.loads(srv.flush_amc())["ran"] is False
+        self.mock_client.amc.assert_not_called()
+
+        srv._amc_pending.append(self.tree_a)
+        assert json.loads(srv.flush_amc())["ran"] is True
         self.mock_client.amc.assert_called_once()
+        assert srv._amc_pending == []
+
+    def test_flush_amc_runs_in_deferring_tree(self):
+        self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
+        self.mock_client.get_ns_type.return_value = "ssimdb"
+        self.mock_client.acr_insert_many.return_value = AcrResult(ok=True)
+        ran_in = []
+        self.mock_client.amc.side_effect = lambda *a, **kw: (
+            ran_in.append(self.mock_client.work_dir) or AcrResult(ok=True))
+
+        srv.create_ctype("mydb", "MyRecord")
+        # Stand-in for set_project(B)
+        self.mock_client.work_dir = self.tree_b
+        result = json.loads(srv.flush_amc())
+
+        assert result["ok"] is True
+        assert ran_in == [self.tree_a]
+        assert self.mock_client.work_dir == self.tree_b
+        assert srv._amc_pending == []
+
+    def test_flush_amc_continues_past_failed_tree(self):
+        srv._amc_pending.extend([self.tree_a, self.tree_b])
+        self.mock_client.amc.side_effect = lambda *a, **kw: AcrResult(
+            ok=self.mock_client.work_dir != self.tree_a, stderr="boom")
+        result = json.loads(srv.flush_amc())
+        assert result["ok"] is False
+        assert self.mock_client.amc.call_count == 2
+        assert [(t["work_dir"], t["ok"]) for t in result["trees"]] == [
+            (str(self.tree_a), False), (str(self.tree_b), True)]
+        assert srv._amc_pending == [self.tree_a]
+
+    def test_flush_amc_drops_removed_tree(self):
+        srv._amc_pending.extend([self.tree_a, self.tree_b])
+        self.tree_a.rmdir()
+        ran_in = []
+        self.mock_client.amc.side_effect = lambda *a, **kw: (
+            ran_in.append(self.mock_client.work_dir) or AcrResult(ok=True))
+        result = json.loads(srv.flush_amc())
+        assert result["ok"] is True
+        assert ran_in == [self.tree_b]
+        assert result["trees"][0] == {"work_dir": str(self.tree_a),
+                                      "skipped": "directory no longer exists"}
+        assert result["trees"][1]["ok"] is True
+        assert srv._amc_pending == []
+
+    def test_run_amc_clears_only_current_tree(self):
+        srv._amc_pending.extend([self.tree_a, self.tree_b])
+        self.mock_client.amc.return_value = AcrResult(ok=True)
+        srv.run_amc()
+        assert srv._amc_pending == [self.tree_b]
 
     def test_ssimdb_camel_case_conversion(self):
         self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
         self.mock_client.get_ns_type.return_value = "ssimdb"
-        self.mock_client.acr_insert.return_value = AcrResult(ok=True)
+        self.mock_client.acr_insert_many.return_value = AcrResult(ok=True)
         self.mock_client.amc.return_value = AcrResult(ok=True)
 
         srv.create_ctype("mydb", "ReadingStatus")
 
-        calls = self.mock_client.acr_insert.call_args_list
-        assert "dmmeta.ssimfile  ssimfile:mydb.reading_status  ctype:mydb.ReadingStatus" in calls[0][0][0]
+        lines = self.mock_client.acr_insert_many.call_args[0][0]
+        assert "dmmeta.ssimfile  ssimfile:mydb.reading_status  ctype:mydb.ReadingStatus" in lines[0]
 
     def test_exe_namespace_no_ssimfile(self):
         self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
@@ -274,30 +355,20 @@ class TestCreateCtypeAutoSsimfile:
         result = json.loads(srv.create_ctype("myapp", "Config"))
         assert result["ok"] is True
         self.mock_client.acr_insert.assert_not_called()
+        self.mock_client.acr_insert_many.assert_not_called()
 
-    def test_ssimfile_insert_failure(self):
+    def test_insert_failure(self):
         self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
         self.mock_client.get_ns_type.return_value = "ssimdb"
-        self.mock_client.acr_insert.return_value = AcrResult(
+        self.mock_client.acr_insert_many.return_value = AcrResult(
             ok=False, stderr="duplicate record", returncode=1
         )
 
         result = json.loads(srv.create_ctype("mydb", "Dup"))
         assert "error" in result
-        assert "ssimfile insert failed" in result["error"]
-
-    def test_cfmt_insert_failure(self):
-        self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
-        self.mock_client.get_ns_type.return_value = "ssimdb"
-        # ssimfile succeeds, cfmt fails
-        self.mock_client.acr_insert.side_effect = [
-            AcrResult(ok=True),
-            AcrResult(ok=False, stderr="cfmt error", returncode=1),
-        ]
-
-        result = json.loads(srv.create_ctype("mydb", "Bad"))
-        assert "error" in result
-        assert "cfmt insert failed" in result["error"]
+        assert "ssimfile/cfmt insert failed" in result["error"]
+        assert "duplicate record" in result["error"]
+        self.mock_client.amc.assert_not_called()
 
 
 class TestCreateFconstUnit:
@@ -329,6 +400,46 @@ class TestCreateFconstUnit:
         assert "error" in result
 
 
+class TestCreateFconstsUnit:
+    """Unit tests for create_fconsts (bulk insert)."""
+
+    @pytest.fixture(autouse=True)
+    def setup_mock_client(self):
+        mock_client = MagicMock(spec=AcrClient)
+        srv._client = mock_client
+        self.mock_client = mock_client
+        yield
+        srv._client = None
+
+    def test_single_insert_for_all_values(self):
+        self.mock_client.acr_insert_many.return_value = AcrResult(ok=True)
+        result = json.loads(srv.create_fconsts(
+            "mydb.Status", [{"value": "active", "comment": "Active"}, {"value": "done"}],
+        ))
+        assert result["ok"] is True
+        assert result["fconsts"] == ["mydb.Status.status/active", "mydb.Status.status/done"]
+        self.mock_client.acr_insert_many.assert_called_once()
+        lines = self.mock_client.acr_insert_many.call_args[0][0]
+        assert lines == [
+            'dmmeta.fconst  fconst:mydb.Status.status/active  value:"active"  comment:"Active"',
+            'dmmeta.fconst  fconst:mydb.Status.status/done  value:"done"  comment:""',
+        ]
+
+    def test_missing_value_rejected(self):
+        result = json.loads(srv.create_fconsts("mydb.Status", [{"value": "a"}, {"comment": "x"}]))
+        assert "error" in result
+        assert result["indexes"] == [1]
+        self.mock_client.acr_insert_many.assert_not_called()
+
+    def test_propagates_error(self):
+        self.mock_client.acr_insert_many.return_value = AcrResult(
+            ok=False, stderr="field not found", returncode=1
+        )
+        result = json.loads(srv.create_fconsts("bad.Field.x", [{"value": "v"}]))
+        assert result["ok"] is False
+        assert "field not found" in result["error"]
+
+
 class TestCreateFinput:
     """Unit tests for create_finput tool."""
 
@@ -1564,3 +1675,472 @@ class TestSetProject:
         result = json.loads(srv.set_project("/nonexistent/bad/path"))
         assert "error" in result
         assert "data/dmmeta" in result["error"]
+
+
+class TestGetFunctionsUnit:
+    """Unit tests for get_functions (mocked client, synthetic headers)."""
+
+    @pytest.fixture(autouse=True)
+    def setup_mock_client(self, tmp_path):
+        mock_client = MagicMock(spec=AcrClient)
+        mock_client.work_dir = tmp_path
+        srv._client = mock_client
+        self.mock_client = mock_client
+        gen = tmp_path / "include" / "gen"
+        gen.mkdir(parents=True)
+        (gen / "mydb_gen.h").write_text(
+            "enum mydb_ColorEnum {        // mydb.Color.value\n"
+            "     mydb_Color_red   = 0\n"
+            "};\n"
+        )
+        (gen / "mydb_gen.inl.h").write_text(
+            "enum mydb_SizeEnum {        // mydb.Size.value\n"
+            "     mydb_Size_small   = 0\n"
+            "};\n"
+        )
+        self.headers = [gen / "mydb_gen.h", gen / "mydb_gen.inl.h"]
+        yield
+        srv._client = None
+
+    def test_preserves_header_order(self):
+        self.mock_client.list_generated_headers.return_value = self.headers
+        result = json.loads(srv.get_functions("mydb"))
+        assert result["headers_parsed"] == [
+            "include/gen/mydb_gen.h",
+            "include/gen/mydb_gen.inl.h",
+        ]
+        assert [e["name"] for e in result["enums"]] == ["mydb_ColorEnum", "mydb_SizeEnum"]
+        assert result["total_enums"] == 2
+
+    def test_no_headers(self):
+        self.mock_client.list_generated_headers.return_value = []
+        result = json.loads(srv.get_functions("mydb"))
+        assert "error" in result
+
+    def test_header_listing_cached_until_dir_changes(self):
+        self.mock_client.list_generated_headers.return_value = self.headers
+        srv.get_functions("mydb")
+        srv.list_generated_headers("mydb")
+        self.mock_client.list_generated_headers.assert_called_once_with("mydb")
+        # Adding a file bumps the directory mtime and forces a rescan
+        gen = self.headers[0].parent
+        os.utime(gen, ns=(0, gen.stat().st_mtime_ns + 1_000_000_000))
+        srv.list_generated_headers("mydb")
+        assert self.mock_client.list_generated_headers.call_count == 2
+
+
+class TestParseCached:
+    """Tests for the mtime/size-keyed parsed header cache."""
+
+    @pytest.fixture(autouse=True)
+    def setup_header(self, tmp_path):
+        self.path = tmp_path / "mydb_gen.h"
+        self.path.write_text(
+            "enum mydb_ColorEnum {        // mydb.Color.value\n"
+            "     mydb_Color_red   = 0\n"
+            "};\n"
+        )
+        srv._parsed_header_cache.clear()
+        yield
+        srv._parsed_header_cache.clear()
+
+    def test_unchanged_file_is_not_reparsed(self):
+        first = srv._parse_cached(self.path)
+        with patch.object(srv, "parse_header_file") as mock_parse:
+            second = srv._parse_cached(self.path)
+        mock_parse.assert_not_called()
+        assert second is first
+
+    def test_modified_file_is_reparsed(self):
+        first = srv._parse_cached(self.path)
+        self.path.write_text(
+            "enum mydb_ColorEnum {        // mydb.Color.value\n"
+            "     mydb_Color_red   = 0\n"
+            "    ,mydb_Color_blue  = 1\n"
+            "};\n"
+        )
+        second = srv._parse_cached(self.path)
+        assert second is not first
+        assert len(second.enums[0].values) == 2
+
+    def test_run_amc_clears_cache(self):
+        srv._parse_cached(self.path)
+        mock_client = MagicMock(spec=AcrClient)
+        mock_client.amc.return_value = AcrResult(ok=True)
+        srv._client = mock_client
+        try:
+            srv.run_amc()
+        finally:
+            srv._client = None
+        assert srv._parsed_header_cache == {}
+
+
+class TestSearchUnit:
+    """Unit tests for the search tool (mocked client)."""
+
+    @pytest.fixture(autouse=True)
+    def setup_mock_client(self, tmp_path):
+        mock_client = MagicMock(spec=AcrClient)
+        mock_client.work_dir = tmp_path
+        self.dmmeta = tmp_path / "data" / "dmmeta"
+        self.dmmeta.mkdir(parents=True)
+        (self.dmmeta / "ctype.ssim").write_text("")
+        (self.dmmeta / "field.ssim").write_text("")
+        srv._client = mock_client
+        self.mock_client = mock_client
+        yield
+        srv._client = None
+
+    def _set_records(self, ctypes, fields):
+        def fake_acr(pattern, **kwargs):
+            if pattern == "dmmeta.ctype:%":
+                return AcrResult(ok=True, records=ctypes)
+            if pattern == "dmmeta.field:%":
+                return AcrResult(ok=True, records=fields)
+            return AcrResult(ok=True)
+        self.mock_client.acr.side_effect = fake_acr
+
+    def test_field_matched_by_name_and_comment_listed_once(self):
+        fields = [
+            {"field": "mydb.Order.price", "arg": "u32", "comment": "Order price"},
+            {"field": "mydb.Order.qty", "arg": "u32", "comment": "Quantity"},
+        ]
+        self._set_records([], fields)
+        result = json.loads(srv.search("price"))
+        assert [f["field"] for f in result["fields"]] == ["mydb.Order.price"]
+        assert result["field_count"] == 1
+
+    def test_name_matches_precede_arg_and_comment_matches(self):
+        fields = [
+            {"field": "mydb.Order.note", "arg": "u32", "comment": "order size"},
+            {"field": "mydb.Order.size", "arg": "u32", "comment": ""},
+        ]
+        self._set_records([{"ctype": "mydb.Order"}, {"ctype": "mydb.Item"}], fields)
+        result = json.loads(srv.search("size"))
+        assert [f["field"] for f in result["fields"]] == ["mydb.Order.size", "mydb.Order.note"]
+        assert result["ctypes"] == []
+
+    def test_ctype_name_match(self):
+        self._set_records([{"ctype": "mydb.Order"}, {"ctype": "mydb.Item"}], [])
+        result = json.loads(srv.search("Ord"))
+        assert [c["ctype"] for c in result["ctypes"]] == ["mydb.Order"]
+        assert result["ctype_count"] == 1
+
+    def test_arg_and_comment_matches_are_case_insensitive(self):
+        fields = [
+            {"field": "mydb.Order.qty", "arg": "u32", "comment": "Quantity"},
+            {"field": "mydb.Order.note", "arg": "algo.Comment", "comment": ""},
+        ]
+        self._set_records([{"ctype": "mydb.Order"}], fields)
+        result = json.loads(srv.search("quantity"))
+        assert [f["field"] for f in result["fields"]] == ["mydb.Order.qty"]
+        result = json.loads(srv.search("COMMENT"))
+        assert [f["field"] for f in result["fields"]] == ["mydb.Order.note"]
+
+    def test_tables_loaded_once(self):
+        self._set_records([{"ctype": "mydb.Order"}], [])
+        srv.search("Order")
+        srv.search("Item")
+        assert self.mock_client.acr.call_count == 2
+
+    def test_mutating_tool_invalidates_tables(self):
+        self._set_records([{"ctype": "mydb.Order"}], [])
+        srv.search("Order")
+        self.mock_client.acr_ed_create.return_value = AcrResult(ok=True)
+        srv.create_field("mydb.Order", "qty", "u32")
+        srv.search("Order")
+        assert self.mock_client.acr.call_count == 4
+
+    def test_external_edit_reloads_changed_table(self):
+        self._set_records([{"ctype": "mydb.Order"}], [])
+        srv.search("Order")
+        field_ssim = self.dmmeta / "field.ssim"
+        st = field_ssim.stat()
+        os.utime(field_ssim, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        srv.search("Order")
+        patterns = [c.args[0] for c in self.mock_client.acr.call_args_list]
+        assert sorted(patterns[2:]) == ["dmmeta.field:%"]
+
+    def test_tables_not_cached_without_ssim_files(self):
+        (self.dmmeta / "ctype.ssim").unlink()
+        self._set_records([{"ctype": "mydb.Order"}], [])
+        srv.search("Order")
+        srv.search("Order")
+        patterns = [c.args[0] for c in self.mock_client.acr.call_args_list]
+        assert patterns.count("dmmeta.ctype:%") == 2
+        assert patterns.count("dmmeta.field:%") == 1
+
+
+class TestGetGeneratedCodeUnit:
+    """Unit tests for get_generated_code truncation (real client, temp work dir)."""
+
+    @pytest.fixture(autouse=True)
+    def setup_client(self, tmp_path):
+        (tmp_path / "bin").mkdir()
+        srv._client = AcrClient(tmp_path)
+        self.gen = tmp_path / "include" / "gen"
+        self.gen.mkdir(parents=True)
+        yield
+        srv._client = None
+
+    def test_small_file_returned_whole(self):
+        (self.gen / "mydb_gen.h").write_text("// small\n")
+        result = json.loads(srv.get_generated_code("include/gen/mydb_gen.h"))
+        assert result["content"] == "// small\n"
+        assert "truncated" not in result
+
+    def test_large_file_truncated(self):
+        (self.gen / "big_gen.h").write_text("x" * 60000)
+        result = json.loads(srv.get_generated_code("include/gen/big_gen.h"))
+        assert result["truncated"] is True
+        assert result["total_bytes"] == 60000
+        assert len(result["content"]) == 50000
+
+    def test_file_at_limit_not_truncated(self):
+        (self.gen / "edge_gen.h").write_text("x" * 50000)
+        result = json.loads(srv.get_generated_code("include/gen/edge_gen.h"))
+        assert "truncated" not in result
+        assert len(result["content"]) == 50000
+
+    def test_not_found(self):
+        result = json.loads(srv.get_generated_code("include/gen/missing_gen.h"))
+        assert "error" in result
+
+
+class TestJsonCompact:
+    """Tests for the compact serializer used by status-style tools."""
+
+    def test_no_whitespace(self):
+        assert srv._json_compact({"ok": True, "n": [1, 2]}) == '{"ok":true,"n":[1,2]}'
+
+    def test_delete_record_uses_compact_output(self):
+        mock_client = MagicMock(spec=AcrClient)
+        mock_client.acr_ed_delete.return_value = AcrResult(ok=True)
+        srv._client = mock_client
+        try:
+            out = srv.delete_record("dmmeta.ctype:myns.X")
+        finally:
+            srv._client = None
+        assert "\n" not in out
+        assert json.loads(out)["ok"] is True
+
+    def test_stdlib_fallback_matches(self, monkeypatch):
+        obj = {"ctype": "mydb.Task", "fields": [{"arg": "u32", "n": 1}], "ok": False}
+        fast = (srv._json(obj), srv._json_compact(obj))
+        monkeypatch.setattr(srv, "orjson", None)
+        assert (srv._json(obj), srv._json_compact(obj)) == fast
+
+
+class TestMutationLock:
+    """Mutating tools and builds run under the module mutation lock."""
+
+    @pytest.fixture(autouse=True)
+    def setup_mock_client(self):
+        mock_client = MagicMock(spec=AcrClient)
+        srv._client = mock_client
+        self.mock_client = mock_client
+        yield
+        srv._client = None
+
+    @staticmethod
+    def _acquire_from_other_thread():
+        acquired = []
+
+        def attempt():
+            got = srv._mut_lock.acquire(blocking=False)
+            if got:
+                srv._mut_lock.release()
+            acquired.append(got)
+        t = threading.Thread(target=attempt)
+        t.start()
+        t.join()
+        return acquired[0]
+
+    def _held(self, *args, **kwargs):
+        self.other_thread_acquired = self._acquire_from_other_thread()
+        return AcrResult(ok=True)
+
+    def test_mutating_tool_holds_lock(self):
+        self.mock_client.acr_ed_delete.side_effect = self._held
+        srv.delete_record("dmmeta.ctype:myns.X")
+        assert self.other_thread_acquired is False
+        assert self._acquire_from_other_thread() is True
+
+    def test_run_abt_holds_lock(self):
+        self.mock_client.abt.side_effect = self._held
+        srv.run_abt("acr")
+        assert self.other_thread_acquired is False
+        assert self._acquire_from_other_thread() is True
+
+
+class TestGetUsageExamplesUnit:
+    """Unit tests for get_usage_examples (mocked client)."""
+
+    CTYPES = [
+        {"ctype": "mydb.Status", "comment": "Record status"},
+        {"ctype": "mydb.Task", "comment": "A task"},
+        {"ctype": "mydb.FieldId", "comment": ""},
+        {"ctype": "mydb.StatusCase", "comment": ""},
+    ]
+    FIELDS = [
+        {"field": "mydb.Status.status", "arg": "algo.Smallstr50", "reftype": "Val", "dflt": "", "comment": ""},
+        {"field": "mydb.Task.task", "arg": "algo.Smallstr50", "reftype": "Val", "dflt": "", "comment": ""},
+        {"field": "mydb.Task.status", "arg": "mydb.Status", "reftype": "Pkey", "dflt": "", "comment": ""},
+        {"field": "mydb.Task.title", "arg": "algo.cstring", "reftype": "Val", "dflt": "", "comment": "Title"},
+        {"field": "mydb.Task.count", "arg": "u32", "reftype": "Val", "dflt": "3", "comment": ""},
+        {"field": "mydb.Task.done", "arg": "bool", "reftype": "Val", "dflt": "", "comment": ""},
+        {"field": "mydb.Task.weight", "arg": "double", "reftype": "Val", "dflt": "", "comment": ""},
+        {"field": "mydb.Task.when", "arg": "algo.UnTime", "reftype": "Val", "dflt": "", "comment": "Due"},
+    ]
+    FCONSTS = [
+        {"fconst": "mydb.Status.status/pending", "value": "pending", "comment": "Not started"},
+        {"fconst": "mydb.Status.status/done", "value": "done", "comment": "Completed"},
+    ]
+
+    @pytest.fixture(autouse=True)
+    def setup_mock_client(self):
+        mock_client = MagicMock(spec=AcrClient)
+        mock_client.list_ctypes.return_value = AcrResult(ok=True, records=self.CTYPES)
+
+        def fake_acr(pattern, **kwargs):
+            if pattern == "dmmeta.field:mydb.%":
+                return AcrResult(ok=True, records=self.FIELDS)
+            if pattern == "dmmeta.fconst:mydb.%":
+                return AcrResult(ok=True, records=self.FCONSTS)
+            return AcrResult(ok=True)
+        mock_client.acr.side_effect = fake_acr
+        srv._client = mock_client
+        self.mock_client = mock_client
+        yield
+        srv._client = None
+
+    def test_fields_fetched_once_per_namespace(self):
+        srv.get_usage_examples("mydb")
+        patterns = [c[0][0] for c in self.mock_client.acr.call_args_list]
+        assert patterns == ["dmmeta.field:mydb.%", "dmmeta.fconst:mydb.%"]
+        self.mock_client.list_fields.assert_not_called()
+
+    def test_enum_and_struct_grouping(self):
+        result = json.loads(srv.get_usage_examples("mydb"))
+        by_name = {t["type_name"]: t for t in result["types"]}
+        assert set(by_name) == {"Status", "Task"}
+        status = by_name["Status"]
+        assert status["is_enum"] is True
+        assert [v["value"] for v in status["enum_values"]] == ["pending", "done"]
+        assert "case mydb_StatusCase_done:  // Completed\n        break;\n" in status["code"][2]["cpp"]
+        task = by_name["Task"]
+        assert task["is_enum"] is False
+        assert [f["name"] for f in task["fields"]] == [
+            "task", "status", "title", "count", "done", "weight", "when",
+        ]
+
+    def test_struct_assignment_lines(self):
+        result = json.loads(srv.get_usage_examples("mydb"))
+        task = next(t for t in result["types"] if t["type_name"] == "Task")
+        cpp = task["code"][0]["cpp"]
+        assert 'rec.status = "some_status";  // FK to mydb.Status' in cpp
+        assert 'rec.title = "example";  // Title' in cpp
+        assert "rec.count = 3;  // u32" in cpp
+        assert "rec.done = true;  // bool" in cpp
+        assert "rec.weight = 0.0;  // double" in cpp
+        assert "// rec.when = ...;  // algo.UnTime Due" in cpp
+
+    def test_field_summary_tolerates_missing_attributes(self):
+        assert srv._field_summary({"field": "mydb.Task.title", "arg": "algo.cstring"}) == {
+            "name": "title", "arg": "algo.cstring", "reftype": "", "comment": "",
+        }
+
+
+class TestQueryCache:
+    """Read-only query tools reuse recent results until the schema changes."""
+
+    @pytest.fixture(autouse=True)
+    def setup_mock_client(self):
+        mock_client = MagicMock(spec=AcrClient)
+        mock_client.acr.return_value = AcrResult(ok=True, records=[{"ctype": "mydb.Task"}])
+        srv._client = mock_client
+        self.mock_client = mock_client
+        yield
+        srv._client = None
+
+    def test_repeated_query_served_from_cache(self):
+        first = srv.query("dmmeta.ctype:mydb.%")
+        assert srv.query("dmmeta.ctype:mydb.%") == first
+        assert self.mock_client.acr.call_count == 1
+
+    def test_distinct_patterns_cached_separately(self):
+        srv.query("dmmeta.ctype:mydb.%")
+        srv.query("dmmeta.ctype:algo.%")
+        assert self.mock_client.acr.call_count == 2
+
+    def test_failed_result_not_cached(self):
+        self.mock_client.acr.return_value = AcrResult(ok=False, stderr="boom")
+        srv.query("dmmeta.ctype:mydb.%")
+        srv.query("dmmeta.ctype:mydb.%")
+        assert self.mock_client.acr.call_count == 2
+
+    def test_entries_expire(self, monkeypatch):
+        monkeypatch.setattr(srv, "_QUERY_TTL", 0.0)
+        srv.query("dmmeta.ctype:mydb.%")
+        srv.query("dmmeta.ctype:mydb.%")
+        assert self.mock_client.acr.call_count == 2
+
+    def test_mutating_tool_clears_cache(self):
+        self.mock_client.list_ctypes.return_value = AcrResult(ok=True, records=[])
+        srv.list_ctypes("mydb")
+        self.mock_client.acr_ed_delete.return_value = AcrResult(ok=True)
+        srv.delete_record("dmmeta.ctype:mydb.Task")
+        srv.list_ctypes("mydb")
+        assert self.mock_client.list_ctypes.call_count == 2
+
+
+class TestPagination:
+    """offset/limit paging on record-list tools."""
+
+    @pytest.fixture(autouse=True)
+    def setup_mock_client(self):
+        mock_client = MagicMock(spec=AcrClient)
+        records = [{"ctype": f"mydb.T{i}"} for i in range(5)]
+        mock_client.acr.return_value = AcrResult(ok=True, records=records)
+        mock_client.list_ctypes.return_value = AcrResult(ok=True, records=records)
+        srv._client = mock_client
+        self.mock_client = mock_client
+        yield
+        srv._client = None
+
+    def test_query_page(self):
+        result = json.loads(srv.query("dmmeta.ctype:mydb.%", offset=1, limit=2))
+        assert [r["ctype"] for r in result["records"]] == ["mydb.T1", "mydb.T2"]
+        assert result["count"] == 2
+        assert result["total"] == 5
+        assert result["has_more"] is True
+
+    def test_last_page(self):
+        result = json.loads(srv.list_ctypes("mydb", offset=4, limit=2))
+        assert [r["ctype"] for r in result["records"]] == ["mydb.T4"]
+        assert result["has_more"] is False
+
+    def test_pages_share_one_acr_call(self):
+        srv.query("dmmeta.ctype:mydb.%", offset=0, limit=2)
+        srv.query("dmmeta.ctype:mydb.%", offset=2, limit=2)
+        assert self.mock_client.acr.call_count == 1
+
+    def test_invalid_bounds_rejected(self):
+        assert "error" in json.loads(srv.query("dmmeta.ctype:%", offset=-1))
+        assert "error" in json.loads(srv.list_fields("mydb.T0", limit=0))
+        self.mock_client.acr.assert_not_called()
+
+    def test_search_pages_both_lists(self):
+        ctypes = [{"ctype": f"mydb.Order{i}"} for i in range(3)]
+        fields = [{"field": "mydb.Order.order", "arg": "u32", "comment": ""}]
+
+        def fake_acr(pattern, **kwargs):
+            return AcrResult(ok=True, records=ctypes if pattern == "dmmeta.ctype:%" else fields)
+        self.mock_client.acr.side_effect = fake_acr
+
+        result = json.loads(srv.search("Order", offset=0, limit=2))
+        assert len(result["ctypes"]) == 2
+        assert len(result["fields"]) == 1
+        assert result["ctype_count"] == 3
+        assert result["field_count"] == 1
+        assert result["has_more"] is True